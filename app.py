@@ -1,14 +1,9 @@
 import streamlit as st
-import os
+import time
 
-# Import modules
-from modules.ui import initialize_session_state, show_sidebar
-from modules.data_manager import ensure_directories, initialize_data_files
-from modules.pages.login import login_page
-from modules.pages.quiz import quiz_page
-from modules.pages.scores import scores_page
-from modules.pages.documentation import documentation_page
-from modules.pages.admin import admin_page
+# Import modules (page modules are imported on first use, see startup.py)
+from modules.ui import initialize_session_state, apply_css, show_sidebar
+from modules.startup import bootstrap, get_page, record_run
 
 # Configure the app
 st.set_page_config(
@@ -20,38 +15,42 @@ st.set_page_config(
 
 # Initialize app data and state
 def initialize_app():
-    # Ensure directories exist
-    ensure_directories()
-    
-    # Initialize data files
-    initialize_data_files()
+    # Directories and data files (once per process)
+    bootstrap()
     
     # Initialize session state
     initialize_session_state()
 
+# Page for this run
+def current_page():
+    page = st.session_state.current_page
+    if not st.session_state.authenticated:
+        return "login"
+    if page in ("quiz", "scores", "verify"):
+        return page
+    if page in ("documentation", "admin") and st.session_state.role == "admin":
+        return page
+    # Default to quiz page
+    st.session_state.current_page = "quiz"
+    return "quiz"
+
 # Main app function
 def main():
+    started = time.perf_counter()
+    
     # Initialize the app
     initialize_app()
     
+    # Custom CSS for every page (sent once per run)
+    apply_css()
+    
     # Show the sidebar for navigation
     show_sidebar()
     
     # Render the appropriate page
-    if not st.session_state.authenticated:
-        login_page()
-    elif st.session_state.current_page == "quiz":
-        quiz_page()
-    elif st.session_state.current_page == "scores":
-        scores_page()
-    elif st.session_state.current_page == "documentation"and st.session_state.role == "admin":
-        documentation_page()
-    elif st.session_state.current_page == "admin" and st.session_state.role == "admin":
-        admin_page()
-    else:
-        # Default to quiz page
-        st.session_state.current_page = "quiz"
-        quiz_page()
+    page = current_page()
+    record_run((time.perf_counter() - started) * 1000)
+    get_page(page)()
 
 # Run the app
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import time
+import random
+import threading
+import weakref
+import numpy as np
+from .item_analysis import get_item_statistics, MIN_RESPONSES
+
+# Adaptive quizzes use a two-parameter logistic (2PL) IRT model: an operator
+# of ability theta answers question j correctly with probability
+# 1 / (1 + exp(-a_j * (theta - b_j))). Each question's discrimination a and
+# difficulty b are estimated from its item statistics; questions with too few
+# answers get the defaults.
+#
+# Everything that depends only on the bank is tabulated once per bank version
+# over a fixed grid of abilities: response log-probabilities for updating the
+# ability estimate, and the questions ordered by information at every grid
+# point, so picking the next question is a lookup rather than a search.
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+LOG_PRIOR = -0.5 * THETA_GRID ** 2  # Standard normal ability prior
+DEFAULT_DISCRIMINATION = 1.0
+DEFAULT_DIFFICULTY = 0.0
+
+# Abilities and scores are only as good as the item parameters, so quizzes
+# use adaptive mode only once at least this share of the bank has been
+# calibrated (MIN_RESPONSES answers each); until then they fall back to fixed
+# quizzes, which also collect the answers needed to calibrate the rest.
+# The share is counted when a bank's pool is built; a pool that isn't ready
+# yet is rebuilt from the latest statistics at most every RECALIBRATE_INTERVAL
+# seconds, so starting a quiz doesn't re-analyse the response log
+MIN_CALIBRATED_SHARE = 0.9
+RECALIBRATE_INTERVAL = 600
+
+# Exposure control: the next question is drawn at random from the
+# EXPOSURE_TOP_K most informative unasked questions (and any tied with the
+# last of them), so operators at the same level don't all see the same
+# questions, and new questions with default parameters all get asked
+EXPOSURE_TOP_K = 5
+
+# Stop once the ability is known to within TARGET_SE (after at least
+# MIN_QUESTIONS), or after MAX_QUESTIONS, whichever comes first
+TARGET_SE = 0.4
+MIN_QUESTIONS = 5
+MAX_QUESTIONS = 25
+
+class ItemPool:
+    def __init__(self, question_ids, discrimination, difficulty, calibrated=0):
+        self.question_ids = tuple(question_ids)
+        self.calibrated = calibrated  # Questions with estimated (not default) parameters
+        self.ready = bool(self.question_ids) and calibrated >= MIN_CALIBRATED_SHARE * len(self.question_ids)
+        self.built = time.monotonic()
+        self.positions = {qid: position for position, qid in enumerate(self.question_ids)}
+        self.discrimination = discrimination
+        self.difficulty = difficulty
+
+        # Grid point x question tables
+        p = 1.0 / (1.0 + np.exp(-discrimination * (THETA_GRID[:, None] - difficulty)))
+        self.p_correct = p
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        information = discrimination ** 2 * p * (1.0 - p)
+        self.order = np.argsort(-information, axis=1, kind="stable")
+        # Information in that order, negated (ascending) for tie lookups
+        self.sorted_information = -np.take_along_axis(information, self.order, axis=1)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+def _calibrated_rows(stats, positions):
+    return [i for i, qid in enumerate(stats["question_id"].tolist())
+            if qid in positions and stats["responses"][i] >= MIN_RESPONSES]
+
+def _calibrate(question_ids):
+    """Estimate 2PL parameters from the classical item statistics, and count the calibrated questions"""
+    count = len(question_ids)
+    discrimination = np.full(count, DEFAULT_DISCRIMINATION)
+    difficulty = np.full(count, DEFAULT_DIFFICULTY)
+
+    # Answers still waiting for the background writer count next time
+    stats = get_item_statistics(flush=False)
+    positions = {qid: position for position, qid in enumerate(question_ids)}
+    rows = _calibrated_rows(stats, positions)
+    if rows:
+        targets = [positions[int(stats["question_id"][i])] for i in rows]
+        p = np.clip(stats["p_value"][rows], 0.02, 0.98)
+        r = np.nan_to_num(stats["discrimination"][rows], nan=0.0)
+
+        # Usual normal-ogive conversions (1.702 maps the logistic onto the normal scale)
+        a = np.where(r > 0.05, 1.702 * r / np.sqrt(1.0 - np.minimum(r, 0.95) ** 2), DEFAULT_DISCRIMINATION)
+        a = np.clip(a, 0.3, 2.5)
+        alpha = a / 1.702
+        z = np.log(p / (1.0 - p)) / 1.702
+        discrimination[targets] = a
+        difficulty[targets] = np.clip(-z * np.sqrt(1.0 + alpha ** 2) / alpha, -3.0, 3.0)
+    return discrimination, difficulty, len(rows)
+
+_pool_lock = threading.Lock()
+_pools = weakref.WeakKeyDictionary()
+
+def get_item_pool(bank):
+    """Tabulated item pool for a question bank, built once per bank version
+    (and rebuilt every RECALIBRATE_INTERVAL until it is ready for adaptive quizzes)"""
+    with _pool_lock:
+        pool = _pools.get(bank)
+        if pool is None or (not pool.ready and time.monotonic() - pool.built > RECALIBRATE_INTERVAL):
+            question_ids = tuple(bank.questions)
+            pool = ItemPool(question_ids, *_calibrate(question_ids))
+            _pools[bank] = pool
+        return pool
+
+def calibration_status(bank):
+    """(calibrated questions, bank size) as of the bank's item pool"""
+    pool = get_item_pool(bank)
+    return pool.calibrated, len(pool)
+
+def adaptive_ready(bank):
+    """Whether enough of the bank is calibrated for adaptive quizzes"""
+    return get_item_pool(bank).ready
+
+def start_ability():
+    """Log-likelihood over the ability grid before any answer"""
+    return np.zeros(len(THETA_GRID))
+
+def update_ability(pool, log_likelihood, question_id, correct):
+    """Log-likelihood after answering a question"""
+    table = pool.log_p if correct else pool.log_q
+    return log_likelihood + table[:, pool.positions[question_id]]
+
+def estimate_ability(log_likelihood):
+    """Posterior mean ability and its standard error"""
+    log_posterior = log_likelihood + LOG_PRIOR
+    weights = np.exp(log_posterior - log_posterior.max())
+    weights /= weights.sum()
+    theta = float(weights @ THETA_GRID)
+    return theta, float(np.sqrt(weights @ (THETA_GRID - theta) ** 2))
+
+def _grid_index(theta):
+    step = THETA_GRID[1] - THETA_GRID[0]
+    return int(np.clip(round((theta - THETA_GRID[0]) / step), 0, len(THETA_GRID) - 1))
+
+def next_question_id(pool, log_likelihood, asked):
+    """Most informative question not yet asked, or None once the quiz should stop"""
+    limit = min(MAX_QUESTIONS, len(pool))
+    theta, se = estimate_ability(log_likelihood)
+    if len(asked) >= limit or (len(asked) >= MIN_QUESTIONS and se <= TARGET_SE):
+        return None
+    grid = _grid_index(theta)
+    order = pool.order[grid]
+    asked_positions = {pool.positions[qid] for qid in asked}
+
+    # Rank of the EXPOSURE_TOP_K-th most informative unasked question
+    found, rank = 0, -1
+    for rank, position in enumerate(order):
+        if position not in asked_positions:
+            found += 1
+            if found == EXPOSURE_TOP_K:
+                break
+    if not found:
+        return None
+
+    # Draw uniformly from every rank up to there, and any tied with it
+    cutoff = pool.sorted_information[grid, rank]
+    end = int(np.searchsorted(pool.sorted_information[grid], cutoff * (1 - 1e-9), side="right"))
+    while True:
+        position = order[random.randrange(max(end, rank + 1))]
+        if position not in asked_positions:
+            return pool.question_ids[position]
+
+def adaptive_score(pool, log_likelihood):
+    """Expected number of correct answers on the whole bank at the estimated ability, and the bank size"""
+    theta, _ = estimate_ability(log_likelihood)
+    expected = pool.p_correct[_grid_index(theta)].sum()
+    return int(round(expected)), len(pool)
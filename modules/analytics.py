@@ -0,0 +1,141 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from .data_manager import ANALYTICS_DIR, get_storage
+
+# Columnar snapshot of the score history for vectorized analytics.
+# Each column is a raw little-endian array in its own file, so the snapshot can
+# be memory-mapped and new attempts are appended without rewriting anything.
+# Usernames are dictionary-encoded: user_id indexes into the "users" list in
+# meta.json.
+COLUMNS = {
+    "user_id": np.dtype("<i4"),
+    "score": np.dtype("<i4"),
+    "max_score": np.dtype("<i4"),
+    "percentage": np.dtype("<f8"),
+    "timestamp": np.dtype("<i8"),  # Seconds since the epoch
+}
+META_FILE = "meta.json"
+
+class ScoreColumns:
+    def __init__(self, users, columns):
+        self.users = np.array(users, dtype=object)
+        self.user_id = columns["user_id"]
+        self.score = columns["score"]
+        self.max_score = columns["max_score"]
+        self.percentage = columns["percentage"]
+        self.timestamp = columns["timestamp"]
+
+    def __len__(self):
+        return len(self.user_id)
+
+    def usernames(self):
+        """Decoded username for every attempt"""
+        return self.users[self.user_id] if len(self.users) else np.array([], dtype=object)
+
+    def to_frame(self, names=None):
+        """DataFrame of every attempt, built column by column (names maps username -> display name)"""
+        usernames = self.usernames()
+        frame = {
+            "username": usernames,
+            "score": self.score,
+            "max_score": self.max_score,
+            "percentage": self.percentage,
+            "timestamp": pd.to_datetime(self.timestamp, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if names is not None:
+            # Map the (few) distinct users, then gather by code
+            user_names = np.array([names.get(u, "Unknown") for u in self.users], dtype=object)
+            frame["name"] = user_names[self.user_id] if len(user_names) else usernames
+        return pd.DataFrame(frame)
+
+def _column_path(name):
+    return os.path.join(ANALYTICS_DIR, f"{name}.bin")
+
+def _read_meta():
+    try:
+        with open(os.path.join(ANALYTICS_DIR, META_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _write_meta(meta):
+    path = os.path.join(ANALYTICS_DIR, META_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+def _encode(scores, user_codes):
+    """Turn attempt records into column arrays, extending user_codes with new users"""
+    return {
+        "user_id": np.fromiter(
+            (user_codes.setdefault(s["username"], len(user_codes)) for s in scores),
+            dtype=COLUMNS["user_id"], count=len(scores)
+        ),
+        "score": np.fromiter((s["score"] for s in scores), dtype=COLUMNS["score"], count=len(scores)),
+        "max_score": np.fromiter((s["max_score"] for s in scores), dtype=COLUMNS["max_score"], count=len(scores)),
+        "percentage": np.fromiter((s["percentage"] for s in scores), dtype=COLUMNS["percentage"], count=len(scores)),
+        "timestamp": np.array([s["timestamp"] for s in scores], dtype="datetime64[s]").astype(COLUMNS["timestamp"]),
+    }
+
+def _sync_snapshot():
+    """Bring the on-disk snapshot up to date with the score history"""
+    os.makedirs(ANALYTICS_DIR, exist_ok=True)
+    storage = get_storage()
+    meta = _read_meta()
+
+    # Read only the attempts past the snapshot's high-water mark; the storage
+    # says when it had to start over (history rewritten, sealed or archived)
+    cursor = meta.get("cursor") if meta and meta.get("engine") == type(storage).__name__ else None
+    new_scores, cursor, reset = storage.read_scores(cursor)
+    rows = 0 if reset else meta["rows"]
+    users = meta["users"] if rows else []
+    user_codes = {username: code for code, username in enumerate(users)}
+
+    if new_scores or reset:
+        encoded = _encode(new_scores, user_codes)
+        for name, dtype in COLUMNS.items():
+            path = _column_path(name)
+            if rows:
+                with open(path, "ab") as f:
+                    # Drop anything past the committed rows (left by a crash before meta was written)
+                    f.truncate(rows * dtype.itemsize)
+                    f.write(encoded[name].tobytes())
+            else:
+                # Rebuild into a new file, so existing memory maps keep their old data
+                with open(path + ".tmp", "wb") as f:
+                    f.write(encoded[name].tobytes())
+                os.replace(path + ".tmp", path)
+        _write_meta({
+            "rows": rows + len(new_scores),
+            "users": list(user_codes),
+            "engine": type(storage).__name__,
+            "cursor": cursor,
+        })
+
+def _open_snapshot():
+    meta = _read_meta()
+    rows = meta["rows"] if meta else 0
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        if rows:
+            columns[name] = np.memmap(_column_path(name), dtype=dtype, mode="r", shape=(rows,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    return ScoreColumns(meta["users"] if meta else [], columns)
+
+_lock = threading.Lock()
+_current = {"signature": None, "columns": None}
+
+def get_score_columns():
+    """Memory-mapped columnar view of every attempt, refreshed when scores change"""
+    with _lock:
+        signature = get_storage().signature("scores")
+        if _current["columns"] is None or _current["signature"] != signature:
+            _sync_snapshot()
+            _current["columns"] = _open_snapshot()
+            _current["signature"] = signature
+        return _current["columns"]
@@ -0,0 +1,78 @@
+import os
+import base64
+import hashlib
+import threading
+import streamlit as st
+from .data_manager import LOGO_PATH, STATIC_DIR
+
+# The logo is read and hashed once per version of the file and its base64
+# form is built at most once, instead of on every render. With static file
+# serving enabled (.streamlit/config.toml) it is published to static/ under
+# a name derived from its content, so pages only send a short, cacheable URL
+# and an uploaded logo gets a new URL rather than a stale cached image.
+STATIC_URL = "app/static"
+
+class Asset:
+    def __init__(self, name, data):
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        is_jpeg = data[:2] == b"\xff\xd8"
+        self.mime = "image/jpeg" if is_jpeg else "image/png"
+        self.filename = f"{name}-{self.digest}{'.jpg' if is_jpeg else '.png'}"
+        self._base64 = None
+        self._published = False
+
+    @property
+    def base64(self):
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.data).decode()
+        return self._base64
+
+    @property
+    def data_uri(self):
+        return f"data:{self.mime};base64,{self.base64}"
+
+    def url(self):
+        """Static URL if static serving is on (publishing the file on first use), else a data URI"""
+        if not st.get_option("server.enableStaticServing"):
+            return self.data_uri
+        if not self._published:
+            self._publish()
+        return f"{STATIC_URL}/{self.filename}"
+
+    def _publish(self):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        path = os.path.join(STATIC_DIR, self.filename)
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.data)
+            os.replace(tmp_path, path)
+
+        # Drop earlier versions of the same asset
+        prefix = self.filename.split("-")[0] + "-"
+        for filename in os.listdir(STATIC_DIR):
+            if filename.startswith(prefix) and filename != self.filename:
+                os.remove(os.path.join(STATIC_DIR, filename))
+        self._published = True
+
+_lock = threading.Lock()
+_logo = {"signature": None, "asset": None}
+
+def get_logo():
+    """The company logo as an Asset, or None if no logo has been uploaded"""
+    try:
+        stat = os.stat(LOGO_PATH)
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        signature = None
+
+    with _lock:
+        if signature != _logo["signature"]:
+            asset = None
+            if signature is not None:
+                with open(LOGO_PATH, "rb") as f:
+                    asset = Asset("logo", f.read())
+            _logo["asset"] = asset
+            _logo["signature"] = signature
+        return _logo["asset"]
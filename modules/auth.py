@@ -1,24 +1,226 @@
+import io
+import os
+import csv
+import hmac
+import json
+import time
 import hashlib
-from .data_manager import load_users, save_users
+import multiprocessing
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .data_manager import get_user, load_users, update_users
+
+# Passwords are hashed with salted PBKDF2-HMAC-SHA256 and stored as
+# "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>". Legacy unsalted SHA-256
+# hashes are still accepted and replaced with a PBKDF2 hash on the next login.
+PASSWORD_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = int(os.environ.get("FORKLIFT_PASSWORD_ITERATIONS", "200000"))
+
+# Hashing runs on a small fixed pool (PBKDF2 releases the GIL), so a burst of
+# logins can use at most HASH_WORKERS cores and the rest wait in line
+HASH_WORKERS = int(os.environ.get("FORKLIFT_HASH_WORKERS", "2"))
+
+# Bulk imports hash across a process pool instead, one worker per core
+BULK_HASH_WORKERS = os.cpu_count() or 1
+USER_ROLES = ("operator", "admin")
+
+class HashPool:
+    def __init__(self, workers):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+
+        # Per-hash (wait in queue, hashing time) in ms for the most recent hashes
+        self.recent = deque(maxlen=200)
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for the result"""
+        submitted = time.monotonic()
+        with self._lock:
+            self.queued += 1
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.recent.append(((started - submitted) * 1000, (finished - started) * 1000))
+
+        return self._executor.submit(task).result()
+
+    def stats(self):
+        """Queue depth and hash latency figures"""
+        with self._lock:
+            recent = list(self.recent)
+            stats = {"queue_depth": self.queued, "running": self.running, "completed": self.completed}
+        waits = [wait for wait, _ in recent]
+        hash_times = [hash_time for _, hash_time in recent]
+        stats.update({
+            "avg_wait_ms": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait_ms": max(waits, default=0.0),
+            "avg_hash_ms": sum(hash_times) / len(hash_times) if hash_times else 0.0,
+            "max_hash_ms": max(hash_times, default=0.0),
+        })
+        return stats
+
+_hash_pool = HashPool(HASH_WORKERS)
+
+def get_hash_pool_stats():
+    return _hash_pool.stats()
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+def _make_hash(password):
+    salt = secrets.token_bytes(16)
+    digest = _pbkdf2(password, salt, PASSWORD_ITERATIONS)
+    return f"{PASSWORD_ALGORITHM}${PASSWORD_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+def _check_hash(password, stored):
+    """Return (matches, needs_upgrade) for a stored hash"""
+    if stored.startswith(PASSWORD_ALGORITHM + "$"):
+        _, iterations, salt, digest = stored.split("$")
+        matches = hmac.compare_digest(_pbkdf2(password, bytes.fromhex(salt), int(iterations)).hex(), digest)
+        return matches, matches and int(iterations) < PASSWORD_ITERATIONS
+
+    # Legacy unsalted SHA-256
+    matches = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    return matches, matches
 
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    return _hash_pool.run(_make_hash, password)
+
+def verify_password(password, stored):
+    """Return (matches, needs_upgrade) for a password against its stored hash"""
+    return _hash_pool.run(_check_hash, password, stored)
+
+def _upgrade_password(username, old_hash, password):
+    new_hash = hash_password(password)
+
+    # Only replace the hash we verified against, in case it changed meanwhile
+    def upgrade(users):
+        if username in users and users[username]["password"] == old_hash:
+            users[username] = {**users[username], "password": new_hash}
+
+    update_users(upgrade)
 
 def authenticate(username, password):
-    users = load_users()
-    if username in users and users[username]["password"] == hash_password(password):
-        return True, users[username]["role"], users[username]["name"]
-    return False, None, None
+    user = get_user(username)
+    if not user:
+        return False, None, None
+
+    matches, needs_upgrade = verify_password(password, user["password"])
+    if not matches:
+        return False, None, None
+    if needs_upgrade:
+        _upgrade_password(username, user["password"], password)
+    return True, user["role"], user["name"]
 
 def add_user(username, password, name, role="operator"):
-    users = load_users()
-    if username in users:
-        return False, "Username already exists"
+    password_hash = hash_password(password)
+
+    # Checked and inserted by the writer, so two registrations can't race
+    def insert(users):
+        if username in users:
+            return False, "Username already exists"
+        users[username] = {
+            "password": password_hash,
+            "role": role,
+            "name": name
+        }
+        return True, "User added successfully"
+
+    return update_users(insert)
+
+# Bulk provisioning
+def parse_user_import(data, filename):
+    """Read user records from an uploaded CSV or JSON file.
     
-    users[username] = {
-        "password": hash_password(password),
-        "role": role,
-        "name": name
-    }
-    save_users(users)
-    return True, "User added successfully"
\ No newline at end of file
+    CSV needs the columns username, password and name (role is optional);
+    JSON needs a list of objects with the same keys.
+    """
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if filename.lower().endswith(".json"):
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("JSON import must be a list of user objects")
+        return records
+    return list(csv.DictReader(io.StringIO(text)))
+
+def _validate_import(records, existing):
+    """Split records into valid, deduplicated users and (row, username, reason) rejections"""
+    valid, rejected, seen = [], [], set()
+    for row, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            rejected.append((row, None, "Not a user record"))
+            continue
+        username = str(record.get("username") or "").strip()
+        password = str(record.get("password") or "")
+        name = str(record.get("name") or "").strip()
+        role = str(record.get("role") or "operator").strip().lower()
+
+        if not username or not password or not name:
+            rejected.append((row, username or None, "username, password and name are required"))
+        elif role not in USER_ROLES:
+            rejected.append((row, username, f"Unknown role '{role}'"))
+        elif username in seen:
+            rejected.append((row, username, "Duplicate username in file"))
+        elif username in existing:
+            rejected.append((row, username, "Username already exists"))
+        else:
+            seen.add(username)
+            valid.append({"username": username, "password": password, "name": name, "role": role})
+    return valid, rejected
+
+def bulk_add_users(records, progress=None):
+    """Validate, hash and add many users with a single write.
+    
+    progress, if given, is called as progress(hashed, total) while the
+    passwords are hashed. Returns (added usernames, rejections) where each
+    rejection is (row, username, reason).
+    """
+    valid, rejected = _validate_import(records, load_users())
+    if not valid:
+        return [], rejected
+
+    # Hash in parallel across processes, in chunks so progress can be reported
+    total = len(valid)
+    chunksize = max(1, min(64, total // (BULK_HASH_WORKERS * 4) or 1))
+    hashes = []
+    # Spawned rather than forked, so no worker starts with a lock held by one of the server's threads
+    with ProcessPoolExecutor(max_workers=min(BULK_HASH_WORKERS, total),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        for password_hash in executor.map(_make_hash, [u["password"] for u in valid], chunksize=chunksize):
+            hashes.append(password_hash)
+            if progress is not None and (len(hashes) % chunksize == 0 or len(hashes) == total):
+                progress(len(hashes), total)
+
+    # One commit for the whole import; usernames taken meanwhile are skipped
+    def insert_all(users):
+        added, taken = [], []
+        for user, password_hash in zip(valid, hashes):
+            if user["username"] in users:
+                taken.append(user["username"])
+                continue
+            users[user["username"]] = {
+                "password": password_hash,
+                "role": user["role"],
+                "name": user["name"]
+            }
+            added.append(user["username"])
+        return added, taken
+
+    added, taken = update_users(insert_all)
+    rejected.extend((None, username, "Username already exists") for username in taken)
+    return added, rejected
@@ -1,104 +1,102 @@
-import datetime
-import base64
-import os
-from .data_manager import LOGO_PATH
+import re
+import html
+import threading
+from .assets import get_logo
+from .pdf import Canvas, Document, can_encode, prepare_image, text_width, wrap_text
 
-# Enhanced certificate with logo
-def create_certificate(name, score, date):
-    # Check if we have a company logo
-    if os.path.exists(LOGO_PATH):
-        # Encode logo to base64 for embedding in HTML
-        with open(LOGO_PATH, "rb") as img_file:
-            logo_base64 = base64.b64encode(img_file.read()).decode()
-        logo_embed = f"data:image/png;base64,{logo_base64}"
-    else:
-        # Use placeholder if no logo
-        logo_embed = "https://via.placeholder.com/100x100?text=LOGO"
-    
-    # Creating a more professional certificate with logo
-    html = f"""
+# Attempts scoring at least this percentage earn a certificate
+PASSING_PERCENTAGE = 80
+
+# The certificate template. It is compiled once per logo: the logo is
+# embedded (once, as a CSS variable used by both the corner logo and the
+# watermark) and the markup is split into ready-encoded chunks, so rendering
+# a certificate only escapes and joins the recipient's details.
+CERTIFICATE_TEMPLATE = """
     <html>
     <head>
         <style>
             @import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@400;600;700&display=swap');
-            body {{
+            :root {
+                --logo: url('$logo');
+            }
+            body {
                 font-family: 'Montserrat', sans-serif;
                 text-align: center;
                 padding: 0;
                 margin: 0;
                 color: #333;
-            }}
-            .certificate {{
+            }
+            .certificate {
                 border: 20px solid #1E88E5;
                 border-radius: 10px;
                 padding: 40px;
                 margin: 20px auto;
                 width: 800px;
                 position: relative;
-                background: #fff url('{logo_embed}') no-repeat 30px 30px;
+                background: #fff var(--logo) no-repeat 30px 30px;
                 background-size: 100px;
-            }}
-            .certificate:after {{
+            }
+            .certificate:after {
                 content: '';
                 position: absolute;
                 top: 0;
                 left: 0;
                 right: 0;
                 bottom: 0;
-                background-image: url('{logo_embed}');
+                background-image: var(--logo);
                 background-repeat: no-repeat;
                 background-position: center;
                 background-size: 50%;
                 opacity: 0.05;
                 pointer-events: none;
-            }}
-            .certificate-header {{
+            }
+            .certificate-header {
                 font-size: 48px;
                 margin: 20px 0;
                 color: #1E88E5;
                 border-bottom: 2px solid #1E88E5;
                 padding-bottom: 10px;
-            }}
-            .certificate-title {{
+            }
+            .certificate-title {
                 font-size: 36px;
                 margin: 20px 0;
                 color: #333;
-            }}
-            .certificate-recipient {{
+            }
+            .certificate-recipient {
                 font-size: 30px;
                 margin: 30px 0;
                 color: #333;
                 border-bottom: 1px solid #eee;
                 padding-bottom: 10px;
                 font-weight: bold;
-            }}
-            .certificate-message {{
+            }
+            .certificate-message {
                 font-size: 20px;
                 margin: 20px 0;
                 line-height: 1.5;
-            }}
-            .certificate-score {{
+            }
+            .certificate-score {
                 font-size: 24px;
                 margin: 20px 0;
                 color: #1E88E5;
                 font-weight: bold;
-            }}
-            .certificate-date {{
+            }
+            .certificate-date {
                 font-size: 18px;
                 margin: 20px 0 40px 0;
-            }}
-            .certificate-signature {{
+            }
+            .certificate-signature {
                 margin: 60px auto 0 auto;
                 border-top: 1px solid #333;
                 width: 200px;
                 padding-top: 10px;
                 font-size: 16px;
-            }}
-            .certificate-footer {{
+            }
+            .certificate-footer {
                 font-size: 14px;
                 margin-top: 50px;
                 color: #777;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -106,15 +104,138 @@ def create_certificate(name, score, date):
             <div class="certificate-header">Certificate of Completion</div>
             <div class="certificate-title">Forklift Operator Safety Training</div>
             <p class="certificate-message">This certifies that</p>
-            <div class="certificate-recipient">{name}</div>
+            <div class="certificate-recipient">$name</div>
             <p class="certificate-message">has successfully completed the Forklift Operator Safety Quiz</p>
-            <div class="certificate-score">with a score of {score}%</div>
-            <div class="certificate-date">Date of Completion: {date}</div>
+            <div class="certificate-score">with a score of $score%</div>
+            <div class="certificate-date">Date of Completion: $date</div>
             <div class="certificate-signature">Training Director</div>
             <div class="certificate-footer">This certificate validates that the recipient has demonstrated knowledge of forklift safety procedures and is qualified in accordance with OSHA standards for the operation of forklifts.</div>
+            <div class="certificate-footer">$certificate_id</div>
         </div>
     </body>
     </html>
+"""
+
+# Used when no logo has been uploaded
+PLACEHOLDER_LOGO = "https://via.placeholder.com/100x100?text=LOGO"
+
+_FIELD = re.compile(r"\$(\w+)")
+
+def _compile(template, **fixed):
+    """Split a $field template into encoded literal chunks and field names, filling in the fixed fields"""
+    parts, literal, position = [], "", 0
+    for match in _FIELD.finditer(template):
+        literal += template[position:match.start()]
+        field = match.group(1)
+        if field in fixed:
+            literal += fixed[field]
+        else:
+            parts.extend([literal.encode(), field])
+            literal = ""
+        position = match.end()
+    parts.append((literal + template[position:]).encode())
+    return parts
+
+_lock = threading.Lock()
+_compiled = {"logo": None, "parts": None}
+
+def _certificate_parts():
+    logo = get_logo()
+    key = logo.digest if logo is not None else None
+    with _lock:
+        if _compiled["parts"] is None or _compiled["logo"] != key:
+            _compiled["parts"] = _compile(
+                CERTIFICATE_TEMPLATE,
+                logo=logo.data_uri if logo is not None else PLACEHOLDER_LOGO
+            )
+            _compiled["logo"] = key
+        return _compiled["parts"]
+
+def render_certificate(name, score, date, certificate_id=None):
+    """Certificate HTML as bytes (e.g. for st.download_button)"""
+    values = {"name": name, "score": score, "date": date,
+              "certificate_id": f"Certificate ID: {certificate_id}" if certificate_id else ""}
+    parts = list(_certificate_parts())
+    parts[1::2] = [html.escape(str(values[field])).encode() for field in parts[1::2]]
+    return b"".join(parts)
+
+# Enhanced certificate with logo
+def create_certificate(name, score, date):
+    return render_certificate(name, score, date).decode()
+
+# PDF certificate: drawn with built-in fonts and the embedded logo only, so it
+# renders without network access (unlike the HTML version's web fonts).
+# US Letter landscape, in points.
+PAGE_WIDTH, PAGE_HEIGHT = 792, 612
+BLUE = (0.118, 0.533, 0.898)  # #1E88E5
+TEXT = (0.2, 0.2, 0.2)  # #333
+MUTED = (0.467, 0.467, 0.467)  # #777
+CERTIFICATE_FOOTER = (
+    "This certificate validates that the recipient has demonstrated knowledge of forklift safety "
+    "procedures and is qualified in accordance with OSHA standards for the operation of forklifts."
+)
+
+def pdf_can_show(name):
+    """Whether a PDF certificate can show this name (the HTML one shows any name)"""
+    return can_encode(name)
+
+def render_certificate_pdf(name, score, date, certificate_id=None):
+    """Certificate as PDF bytes; identical inputs give identical files.
+
+    Raises ValueError for a name pdf_can_show() rejects, rather than
+    printing it with "?" in place of some of its characters.
     """
-    
-    return html
\ No newline at end of file
+    if not pdf_can_show(name):
+        raise ValueError(f"The name {name!r} has characters a PDF certificate can't show")
+    logo = get_logo()
+    prepared = prepare_image(logo.data) if logo is not None else None
+
+    document = Document(PAGE_WIDTH, PAGE_HEIGHT)
+    canvas = Canvas()
+    center = PAGE_WIDTH / 2
+
+    # Logo in the corner and as a faint watermark (embedded once, drawn twice)
+    if prepared is not None:
+        document.add_image("Logo", prepared)
+        document.add_opacity("Faint", 0.05)
+        aspect = prepared[1] / prepared[0]
+        watermark = (PAGE_WIDTH - 40) / 2
+        canvas.image("Logo", center - watermark / 2, (PAGE_HEIGHT - watermark * aspect) / 2,
+                     watermark, watermark * aspect, state="Faint")
+        canvas.image("Logo", 45, PAGE_HEIGHT - 45 - 100 * aspect, 100, 100 * aspect)
+
+    canvas.set_stroke(*BLUE)
+    canvas.rect(25, 25, PAGE_WIDTH - 50, PAGE_HEIGHT - 50, 10)
+    canvas.line(150, 482, PAGE_WIDTH - 150, 482, 2)
+
+    canvas.set_fill(*BLUE)
+    canvas.centered_text(center, 495, "Certificate of Completion", "F2", 36)
+    canvas.set_fill(*TEXT)
+    canvas.centered_text(center, 440, "Forklift Operator Safety Training", "F1", 26)
+    canvas.centered_text(center, 395, "This certifies that", "F1", 16)
+
+    # Shrink long names to fit the page
+    name = str(name)
+    size = min(28, 28 * 560 / max(text_width(name, "F2", 28), 1))
+    canvas.centered_text(center, 352, name, "F2", size)
+    underline = text_width(name, "F2", size) / 2 + 20
+    canvas.set_stroke(0.933, 0.933, 0.933)
+    canvas.line(center - underline, 340, center + underline, 340, 1)
+
+    canvas.centered_text(center, 308, "has successfully completed the Forklift Operator Safety Quiz", "F1", 16)
+    canvas.set_fill(*BLUE)
+    canvas.centered_text(center, 272, f"with a score of {score}%", "F2", 20)
+    canvas.set_fill(*TEXT)
+    canvas.centered_text(center, 238, f"Date of Completion: {date}", "F1", 14)
+
+    canvas.set_stroke(*TEXT)
+    canvas.line(center - 100, 180, center + 100, 180, 1)
+    canvas.centered_text(center, 165, "Training Director", "F1", 12)
+
+    canvas.set_fill(*MUTED)
+    for row, line in enumerate(wrap_text(CERTIFICATE_FOOTER, "F1", 10, 560)):
+        canvas.centered_text(center, 115 - row * 13, line, "F1", 10)
+    if certificate_id:
+        canvas.centered_text(center, 50, f"Certificate ID: {certificate_id}", "F1", 10)
+
+    return document.render(canvas, "Certificate of Completion")
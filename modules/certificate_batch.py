@@ -0,0 +1,130 @@
+import os
+import re
+import csv
+import io
+import zipfile
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .data_manager import load_scores, load_users, ARCHIVE_DIR
+from .certificate import PASSING_PERCENTAGE, pdf_can_show
+from .certificate_store import RENDERERS, certificate_details, lookup_certificate, stored_certificate, store_certificate
+
+# Certificates for every passing attempt in a date range, as one zip archive
+# (e.g. for auditors). Certificates already in the certificate store are read
+# from it; the rest are rendered across a process pool a window at a time and
+# stored. Either way each one is written straight into a zip in ARCHIVE_DIR,
+# so only the documents in flight are held in memory. Archives are left for
+# the admin to download; ones a session never removed (it ended, or the
+# server restarted) are deleted by a later build once ARCHIVE_MAX_AGE old.
+BATCH_WORKERS = os.cpu_count() or 1
+BATCH_WINDOW = 256  # Certificates rendered per round
+BATCH_PARALLEL_MIN = 50  # Smaller batches are rendered in this process
+ARCHIVE_MAX_AGE = 24 * 60 * 60  # Seconds
+ARCHIVE_COMPRESSION = {
+    "pdf": zipfile.ZIP_STORED,  # Already compressed
+    "html": zipfile.ZIP_DEFLATED,
+}
+
+def passing_attempts(start=None, end=None):
+    """Passing attempts between start and end (inclusive), with the operator's name"""
+    users = load_users()
+    return [
+        {**score, "name": users.get(score["username"], {}).get("name", score["username"])}
+        for score in load_scores(start, end)
+        if score["percentage"] >= PASSING_PERCENTAGE
+    ]
+
+def _archive_name(attempt, extension, used):
+    username = re.sub(r"[^A-Za-z0-9_.-]", "_", attempt["username"])
+    stamp = attempt["timestamp"].replace("-", "").replace(":", "").replace(" ", "-")
+    name, copy = f"{username}_{stamp}", 1
+    # Attempts by the same user within one second would otherwise share a name
+    while f"{name}.{extension}" in used:
+        copy += 1
+        name = f"{username}_{stamp}_{copy}"
+    used.add(f"{name}.{extension}")
+    return f"{name}.{extension}"
+
+def _certificate_job(details, certificate_format):
+    return certificate_format, details["name"], details["score"], details["date"], details["id"]
+
+def _render(job):
+    certificate_format, name, score, date, certificate_id = job
+    return RENDERERS[certificate_format](name, score, date, certificate_id)
+
+def _render_all(jobs):
+    """Rendered certificates in job order, a window at a time"""
+    if len(jobs) < BATCH_PARALLEL_MIN:
+        for job in jobs:
+            yield _render(job)
+        return
+    # Workers are spawned, not forked: a fork of the threaded server could
+    # inherit a lock (e.g. the logo cache's) held by another thread and hang
+    with ProcessPoolExecutor(max_workers=min(BATCH_WORKERS, len(jobs)),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        chunksize = max(1, BATCH_WINDOW // (BATCH_WORKERS * 4))
+        for first in range(0, len(jobs), BATCH_WINDOW):
+            yield from executor.map(_render, jobs[first:first + BATCH_WINDOW], chunksize=chunksize)
+
+def _remove_stale_archives():
+    now = time.time()
+    try:
+        entries = list(os.scandir(ARCHIVE_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > ARCHIVE_MAX_AGE:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            continue  # Removed by another session meanwhile
+
+def build_certificate_archive(attempts, certificate_format="pdf", progress=None):
+    """Write a certificate for every attempt into a zip file and return its path.
+
+    The archive also holds index.csv listing each certificate; operators
+    whose names the PDF fonts can't show get HTML certificates in a PDF
+    archive. progress, if given, is called as progress(done, total). The
+    caller should remove the file when done with it; otherwise a later build
+    removes it once it is ARCHIVE_MAX_AGE old.
+    """
+    _remove_stale_archives()
+    details = [certificate_details(attempt, attempt["name"]) for attempt in attempts]
+    formats = [certificate_format if certificate_format != "pdf" or pdf_can_show(d["name"]) else "html" for d in details]
+    issued = [f in (lookup_certificate(d["id"]) or {}).get("files", {}) for d, f in zip(details, formats)]
+    rendered = _render_all([_certificate_job(d, f) for d, f, stored in zip(details, formats, issued) if not stored])
+
+    index = io.StringIO()
+    writer = csv.writer(index)
+    writer.writerow(["file", "certificate_id", "username", "name", "timestamp", "score", "max_score", "percentage"])
+
+    used = set()
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="certificates-", suffix=".zip", dir=ARCHIVE_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w") as archive:
+            for done, (attempt, certificate, document_format, stored) in enumerate(
+                    zip(attempts, details, formats, issued), start=1):
+                document = stored_certificate(certificate, document_format) if stored else next(rendered)
+                if document is None:
+                    # Indexed, but the stored file has gone missing
+                    document = _render(_certificate_job(certificate, document_format))
+                    stored = False
+                if not stored:
+                    store_certificate(certificate, document_format, document)
+
+                filename = _archive_name(attempt, document_format, used)
+                archive.writestr(filename, document, compress_type=ARCHIVE_COMPRESSION[document_format])
+                writer.writerow([filename, certificate["id"], attempt["username"], attempt["name"], attempt["timestamp"],
+                                 attempt["score"], attempt["max_score"], f"{attempt['percentage']:.1f}"])
+                if progress is not None and (done % BATCH_WINDOW == 0 or done == len(attempts)):
+                    progress(done, len(attempts))
+            archive.writestr("index.csv", index.getvalue(), compress_type=zipfile.ZIP_DEFLATED)
+    except BaseException:
+        os.remove(path)
+        raise
+    finally:
+        rendered.close()
+    return path
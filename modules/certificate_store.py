@@ -0,0 +1,149 @@
+import os
+import json
+import base64
+import hashlib
+import datetime
+import threading
+from .data_manager import CERTIFICATE_DIR
+from .certificate import render_certificate, render_certificate_pdf
+
+# Issued certificates. Each certificate gets a stable ID derived from a hash
+# of (username, attempt, score, date), where an attempt is identified, as
+# elsewhere, by its score timestamp. Rendered files are stored once under the
+# SHA-256 of their content (objects/ab/cdef....pdf), so downloading a
+# certificate again reads the stored file instead of rendering it, and a
+# presented file can be checked byte for byte.
+#
+# index.jsonl is append-only: one line per stored file, giving the
+# certificate's details and the format and digest of the file. It is read
+# into dictionaries (by ID and by digest) once per version of the file.
+INDEX_FILE = "index.jsonl"
+OBJECTS_DIR = "objects"
+RENDERERS = {"pdf": render_certificate_pdf, "html": render_certificate}
+
+def certificate_details(score_record, name):
+    """Certificate fields for a passing attempt from the score history"""
+    attempt = score_record["timestamp"]
+    details = {
+        "username": score_record["username"],
+        "name": name,
+        "attempt": attempt,
+        "score": f"{score_record['percentage']:.1f}",
+        "date": datetime.datetime.strptime(attempt, "%Y-%m-%d %H:%M:%S").strftime("%B %d, %Y"),
+    }
+    details["id"] = certificate_id(details["username"], attempt, details["score"], details["date"])
+    return details
+
+def certificate_id(username, attempt, score, date):
+    """Stable ID such as 7KQ2-M4XD-PZ3A-HT6C"""
+    key = "\x1f".join(str(part) for part in (username, attempt, score, date)).encode()
+    code = base64.b32encode(hashlib.sha256(key).digest()[:10]).decode()
+    return "-".join(code[i:i + 4] for i in range(0, len(code), 4))
+
+def normalize_id(value):
+    """Accept an ID typed with any case, spacing or dashes"""
+    code = "".join(ch for ch in str(value).upper() if ch.isalnum())
+    return "-".join(code[i:i + 4] for i in range(0, len(code), 4))
+
+def _object_path(digest, certificate_format):
+    return os.path.join(CERTIFICATE_DIR, OBJECTS_DIR, digest[:2], f"{digest[2:]}.{certificate_format}")
+
+def _write_object(data, certificate_format):
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest, certificate_format)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+def _index_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+_lock = threading.Lock()
+_index = {"signature": None, "by_id": {}, "by_digest": {}}
+
+def _add_to_index(entry):
+    record = _index["by_id"].setdefault(entry["id"], {
+        key: entry[key] for key in ("id", "username", "name", "attempt", "score", "date")
+    })
+    record.setdefault("files", {})[entry["format"]] = entry["digest"]
+    _index["by_digest"][entry["digest"]] = (entry["id"], entry["format"])
+
+def _refresh_index():
+    """Reload the index if another process has added to it (call with _lock held)"""
+    path = os.path.join(CERTIFICATE_DIR, INDEX_FILE)
+    signature = _index_signature(path)
+    if signature == _index["signature"]:
+        return
+    _index.update({"signature": signature, "by_id": {}, "by_digest": {}})
+    if signature is None:
+        return
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                _add_to_index(json.loads(line))
+            except (ValueError, KeyError):
+                continue  # A line torn by a crash
+
+def _append_index(entry):
+    os.makedirs(CERTIFICATE_DIR, exist_ok=True)
+    path = os.path.join(CERTIFICATE_DIR, INDEX_FILE)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    _add_to_index(entry)
+    _index["signature"] = _index_signature(path)
+
+def stored_certificate(details, certificate_format):
+    """The stored file for a certificate, or None if it hasn't been issued in that format"""
+    with _lock:
+        _refresh_index()
+        record = _index["by_id"].get(details["id"])
+        digest = record and record.get("files", {}).get(certificate_format)
+    if digest is None:
+        return None
+    try:
+        with open(_object_path(digest, certificate_format), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def store_certificate(details, certificate_format, data):
+    """Store a rendered certificate and index it"""
+    digest = _write_object(data, certificate_format)
+    with _lock:
+        _refresh_index()
+        record = _index["by_id"].get(details["id"])
+        if record is None or record.get("files", {}).get(certificate_format) != digest:
+            _append_index({**{key: details[key] for key in ("id", "username", "name", "attempt", "score", "date")},
+                           "format": certificate_format, "digest": digest})
+
+def issue_certificate(score_record, name, certificate_format="pdf"):
+    """(certificate ID, file bytes) for a passing attempt, rendered only the first time"""
+    details = certificate_details(score_record, name)
+    data = stored_certificate(details, certificate_format)
+    if data is None:
+        data = RENDERERS[certificate_format](details["name"], details["score"], details["date"], details["id"])
+        store_certificate(details, certificate_format, data)
+    return details["id"], data
+
+def lookup_certificate(value):
+    """Details of an issued certificate by ID, or None"""
+    with _lock:
+        _refresh_index()
+        record = _index["by_id"].get(normalize_id(value))
+        return {**record, "files": dict(record["files"])} if record else None
+
+def verify_certificate_file(data):
+    """Details of the issued certificate this file is an unaltered copy of, or None"""
+    with _lock:
+        _refresh_index()
+        match = _index["by_digest"].get(hashlib.sha256(data).hexdigest())
+        record = _index["by_id"][match[0]] if match else None
+        return {**record, "files": dict(record["files"])} if record else None
@@ -0,0 +1,95 @@
+import os
+import json
+import datetime
+from urllib.parse import quote
+from .data_manager import CHECKPOINT_DIR
+from .storage import _append_lines
+
+# Checkpoints of quizzes in progress, so an operator can pick up where they
+# left off after a dropped connection or a server restart. Each user has one
+# small append-only file: a start record with the attempt's questions, then a
+# short record per answer (and per question an adaptive quiz picks). Saving an
+# answer is a single small append, never a rewrite; a line torn by a crash is
+# ignored. When the quiz is finished a completion record is appended before
+# the score is saved, and the file is removed after; a checkpoint that was
+# completed is never resumed, so a crash in between can't save the attempt
+# twice.
+
+def _checkpoint_path(username):
+    return os.path.join(CHECKPOINT_DIR, quote(username, safe="") + ".jsonl")
+
+def _write(username, record, mode="a"):
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    if mode == "a":
+        _append_lines(_checkpoint_path(username), line)
+    else:
+        with open(_checkpoint_path(username), mode) as f:
+            f.write(line)
+
+def start_checkpoint(username, attempt, adaptive, question_ids):
+    """Start checkpointing a new attempt (replaces any earlier checkpoint)"""
+    _write(username, {
+        "attempt": attempt,
+        "adaptive": adaptive,
+        "questions": list(question_ids),
+        "started": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }, mode="w")
+
+def checkpoint_answer(username, index, chosen, correct):
+    """Record the answer to the question at position index"""
+    _write(username, {"i": index, "c": chosen, "ok": int(correct)})
+
+def checkpoint_question(username, question_id):
+    """Record a question added to an adaptive quiz"""
+    _write(username, {"q": question_id})
+
+def complete_checkpoint(username):
+    """Mark the attempt finished (call before saving its score)"""
+    _write(username, {"done": 1})
+
+def clear_checkpoint(username):
+    try:
+        os.remove(_checkpoint_path(username))
+    except FileNotFoundError:
+        pass
+
+def load_checkpoint(username):
+    """The user's unfinished attempt, or None if there isn't one (or it was completed).
+    
+    Returns a dict with attempt, adaptive, started, question_ids and answers,
+    a list of (index, chosen option, correct) in the order given.
+    """
+    try:
+        with open(_checkpoint_path(username), "r") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Torn by a crash mid-append
+            continue
+    if not records or "attempt" not in records[0]:
+        return None
+
+    start = records[0]
+    question_ids = list(start["questions"])
+    answers = []
+    for record in records[1:]:
+        if "q" in record:
+            question_ids.append(record["q"])
+        elif "i" in record:
+            answers.append((record["i"], record["c"], bool(record["ok"])))
+        elif "done" in record:
+            return None
+    return {
+        "attempt": start["attempt"],
+        "adaptive": start["adaptive"],
+        "started": start["started"],
+        "question_ids": tuple(question_ids),
+        "answers": answers,
+    }
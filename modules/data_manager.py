@@ -1,125 +1,610 @@
 import os
 import json
+import time
+import queue
+import atexit
 import datetime
+import threading
+from collections import deque
+from .storage import JsonStorage, SqliteStorage, _atomic_write
 
 # File paths
 USER_DB_FILE = "data/users.json"
 QUESTIONS_FILE = "data/questions.json"
-SCORES_FILE = "data/scores.json"
+SCORES_FILE = "data/scores.json"  # Legacy array file, migrated into SCORES_LOG_FILE
+SCORES_LOG_FILE = "data/scores.jsonl"
+RESPONSES_FILE = "data/responses.jsonl"  # One record per answered question
+QUIZ_BLUEPRINT_FILE = "data/quiz_blueprint.json"
+SCORE_SEGMENTS_DIR = "data/score_segments"  # Sealed monthly segments (archive/ holds retired ones)
+DB_FILE = "data/forklift.db"
+ANALYTICS_DIR = "data/analytics"  # Columnar score snapshot (see analytics.py)
+ITEM_ANALYSIS_DIR = "data/item_analysis"  # Persisted response matrix (see item_analysis.py)
+CHECKPOINT_DIR = "data/checkpoints"  # Quizzes in progress (see checkpoints.py)
+CERTIFICATE_DIR = "data/certificates"  # Issued certificates (see certificate_store.py)
+ARCHIVE_DIR = "data/archives"  # Certificate archives built for download (see certificate_batch.py)
 LOGO_PATH = "assets/XLC2.png"
+STATIC_DIR = "static"  # Served at app/static/ (see assets.py)
+
+# Storage engine: "json" (default, plain files) or "sqlite" (indexed, WAL mode)
+STORAGE_ENGINE = os.environ.get("FORKLIFT_STORAGE_ENGINE", "json")
+
+# Attempts older than this many months are archived and no longer loaded (0 keeps everything)
+SCORE_RETENTION_MONTHS = int(os.environ.get("FORKLIFT_SCORE_RETENTION_MONTHS", "0"))
+
+# Group commit: writes arriving within COMMIT_MAX_DELAY seconds of each other
+# are committed together, up to COMMIT_MAX_BATCH writes per batch
+COMMIT_MAX_BATCH = 256
+COMMIT_MAX_DELAY = 0.005
+
+# Answer responses are buffered in memory and written in the background at
+# least every RESPONSE_FLUSH_INTERVAL seconds, or as soon as RESPONSE_MAX_BATCH
+# are waiting
+RESPONSE_FLUSH_INTERVAL = 1.0
+RESPONSE_MAX_BATCH = 1000
+
+_storage = None
+
+def _json_storage():
+    return JsonStorage(
+        USER_DB_FILE, QUESTIONS_FILE, SCORES_LOG_FILE,
+        legacy_scores_file=SCORES_FILE,
+        segments_dir=SCORE_SEGMENTS_DIR,
+        retention_months=SCORE_RETENTION_MONTHS,
+        responses_file=RESPONSES_FILE
+    )
+
+def get_storage():
+    """Return the configured storage engine (created on first use)"""
+    global _storage
+    if _storage is None:
+        if STORAGE_ENGINE == "json":
+            _storage = _json_storage()
+        elif STORAGE_ENGINE == "sqlite":
+            # The JSON files are imported the first time the database is created
+            _storage = SqliteStorage(DB_FILE, import_from=_json_storage(), retention_months=SCORE_RETENTION_MONTHS)
+        else:
+            raise ValueError(f"Unknown storage engine: {STORAGE_ENGINE}")
+    return _storage
+
+# Process-wide cache for the loaders, shared by every session.
+# Entries are keyed on the storage signature (file mtime/size) plus a
+# generation counter that the save_* functions bump, so a rerun only
+# reparses data that actually changed.
+_cache = {}
+_cache_lock = threading.Lock()
+_generations = {"questions": 0, "scores": 0, "responses": 0}
+
+def _cached(key, kind, loader):
+    """Return loader() from the cache, reloading if the "kind" data changed"""
+    version = (_generations[kind], get_storage().signature(kind))
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    
+    value = loader()
+    with _cache_lock:
+        _cache[key] = (version, value)
+    return value
+
+def _bump_generation(kind):
+    with _cache_lock:
+        _generations[kind] += 1
+
+def clear_cache():
+    """Drop every cached load (the next call reads from storage again)"""
+    with _cache_lock:
+        _cache.clear()
+    _user_directory.invalidate()
+
+# User directory: the users as one in-memory dict shared by every session and
+# thread, so a login is a dict lookup. Writes go through the commit queue and
+# the dict the writer just saved becomes the new snapshot (write-through);
+# changes made to the file by anything else are picked up lazily via its
+# signature. A published snapshot is never modified, only replaced.
+class UserDirectory:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = None
+        self._signature = None
+
+    def snapshot(self):
+        """The current users dict (shared, treat as read-only)"""
+        storage = get_storage()
+        signature = storage.signature("users")
+        with self._lock:
+            if self._users is None or signature != self._signature:
+                self._users = storage.load_users()
+                self._signature = signature
+            return self._users
+
+    def get(self, username):
+        return self.snapshot().get(username)
+
+    def invalidate(self):
+        with self._lock:
+            self._users = None
+
+    def publish(self, users):
+        """Adopt the users the writer has just saved"""
+        with self._lock:
+            self._users = users
+            self._signature = get_storage().signature("users")
+
+_user_directory = UserDirectory()
+
+# Running score aggregates for the admin dashboard.
+# Built once from the score history, then updated by the writer with every
+# committed batch, so reading them costs O(users) instead of O(attempts).
+# Score ranges match the admin "Score Distribution" chart: 0-20, 21-40, ...
+SCORE_BINS = [20, 40, 60, 80, 100]
+SCORE_BIN_LABELS = ["0-20%", "21-40%", "41-60%", "61-80%", "81-100%"]
+
+def score_bin(percentage):
+    """Index of the score range a percentage falls into"""
+    for i, upper in enumerate(SCORE_BINS):
+        if percentage <= upper:
+            return i
+    return len(SCORE_BINS) - 1
+
+class ScoreAggregates:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None  # Storage signature the totals correspond to
+        self._built = False
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.bins = [0] * len(SCORE_BINS)
+        self.per_user = {}  # username -> [count, total, best]
+
+    def _add(self, score_data):
+        percentage = score_data["percentage"]
+        self.count += 1
+        self.total += percentage
+        self.bins[score_bin(percentage)] += 1
+        user = self.per_user.get(score_data["username"])
+        if user is None:
+            self.per_user[score_data["username"]] = [1, percentage, percentage]
+        else:
+            user[0] += 1
+            user[1] += percentage
+            user[2] = max(user[2], percentage)
+
+    def _rebuild(self):
+        storage = get_storage()
+        signature = storage.signature("scores")
+        self._reset()
+        for score_data in storage.load_scores():
+            self._add(score_data)
+        self._signature = signature
+        self._built = True
+
+    def apply(self, scores, before, after):
+        """Fold a committed batch in, if the totals were current before it"""
+        with self._lock:
+            if self._built and self._signature == before:
+                for score_data in scores:
+                    self._add(score_data)
+                self._signature = after
+            else:
+                self._built = False
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    def snapshot(self):
+        """Current totals; rebuilt only if the history changed outside this process"""
+        with self._lock:
+            if not self._built or self._signature != get_storage().signature("scores"):
+                self._rebuild()
+            return {
+                "count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "bins": dict(zip(SCORE_BIN_LABELS, self.bins)),
+                "per_user": {
+                    username: {"count": count, "total": total, "mean": total / count, "best": best}
+                    for username, (count, total, best) in self.per_user.items()
+                },
+            }
+
+_score_aggregates = ScoreAggregates()
+
+def get_score_aggregates():
+    """Attempt count, mean, score-range counts and per-user count/mean/best"""
+    return _score_aggregates.snapshot()
+
+# Single-writer commit queue.
+# Score appends and user updates from every session are handed to one writer
+# thread, which folds whatever is pending into one atomic write (one append +
+# fsync for scores, one temp file + rename or one transaction for users).
+# Callers block until their write is committed, so the API stays synchronous.
+class _PendingWrite:
+    __slots__ = ("kind", "payload", "enqueued", "done", "result", "error")
+
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class CommitQueue:
+    def __init__(self, max_batch=COMMIT_MAX_BATCH, max_delay=COMMIT_MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        
+        # Per-batch (size, latency in ms) for the most recent batches
+        self.recent_batches = deque(maxlen=100)
+        self.total_batches = 0
+        self.total_writes = 0
+
+    def submit(self, kind, payload):
+        """Queue a write and wait until it has been committed"""
+        self._ensure_started()
+        write = _PendingWrite(kind, payload)
+        self._queue.put(write)
+        write.done.wait()
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def stats(self):
+        """Batch size and latency figures for the recent batches"""
+        recent = list(self.recent_batches)
+        sizes = [size for size, _ in recent]
+        latencies = [latency for _, latency in recent]
+        return {
+            "total_batches": self.total_batches,
+            "total_writes": self.total_writes,
+            "last_batch_size": sizes[-1] if sizes else 0,
+            "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "avg_latency_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency_ms": max(latencies, default=0.0),
+            "recent_batches": recent,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="commit-queue", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            
+            # Give concurrent sessions a short window to join this batch
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            self._commit(batch)
+            
+            finished = time.monotonic()
+            latency_ms = (finished - min(w.enqueued for w in batch)) * 1000
+            self.recent_batches.append((len(batch), latency_ms))
+            self.total_batches += 1
+            self.total_writes += len(batch)
+            for write in batch:
+                write.done.set()
+
+    def _commit(self, batch):
+        # Commit runs of the same kind together, keeping the submission order
+        run = []
+        for write in batch:
+            if run and run[0].kind != write.kind:
+                self._commit_run(run)
+                run = []
+            run.append(write)
+        if run:
+            self._commit_run(run)
+
+    def _commit_run(self, run):
+        storage = get_storage()
+        kind = run[0].kind
+        try:
+            if kind == "scores":
+                scores = [write.payload for write in run]
+                # Seal last month's attempts first if the month has changed
+                storage.roll_over()
+                before = storage.signature("scores")
+                storage.append_scores(scores)
+                _bump_generation("scores")
+                _score_aggregates.apply(scores, before, storage.signature("scores"))
+            elif kind == "scores_replace":
+                # Only the last replacement matters
+                storage.save_scores(run[-1].payload)
+                _bump_generation("scores")
+                _score_aggregates.invalidate()
+            elif kind == "users":
+                # Apply every update to a copy of the latest users, write what
+                # changed once, then publish the copy to the directory
+                current = _user_directory.snapshot()
+                users = dict(current)
+                for write in run:
+                    try:
+                        write.result = write.payload(users)
+                    except Exception as e:
+                        write.error = e
+                changed = {username: info for username, info in users.items() if current.get(username) != info}
+                removed = [username for username in current if username not in users]
+                if changed or removed:
+                    storage.save_user_changes(users, changed, removed)
+                _user_directory.publish(users)
+            else:
+                raise ValueError(f"Unknown write kind: {kind}")
+        except Exception as e:
+            for write in run:
+                write.error = write.error or e
+
+_commit_queue = CommitQueue()
+
+def get_commit_stats():
+    """Per-batch size and latency of the group-commit writer"""
+    return _commit_queue.stats()
+
+# Response log: the quiz records every answer here without waiting for the
+# disk. A background thread drains the buffer and appends it to storage in
+# batches; if the buffer is full the oldest responses are dropped rather than
+# slowing down the quiz.
+class ResponseLog:
+    def __init__(self, flush_interval=RESPONSE_FLUSH_INTERVAL, max_batch=RESPONSE_MAX_BATCH, max_buffer=100000):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition(self._lock)
+        self._thread = None
+        self._writing = 0
+        self.total_recorded = 0
+        self.total_written = 0
+        self.total_batches = 0
+        self.errors = 0
+
+    def record(self, response):
+        """Queue a response for writing (never blocks on the disk)"""
+        with self._lock:
+            self._buffer.append(response)
+            self.total_recorded += 1
+            full = len(self._buffer) >= self.max_batch
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def flush(self, timeout=None):
+        """Write everything recorded so far and wait for it"""
+        self._ensure_started()
+        self._wake.set()
+        with self._lock:
+            return self._flushed.wait_for(lambda: not self._buffer and not self._writing, timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "total_recorded": self.total_recorded,
+                "total_written": self.total_written,
+                "dropped": self.total_recorded - self.total_written - len(self._buffer) - self._writing,
+                "total_batches": self.total_batches,
+                "errors": self.errors,
+            }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="response-log", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+                self._writing = len(batch)
+                if not batch:
+                    self._flushed.notify_all()
+                    return
+            try:
+                get_storage().append_responses(batch)
+                _bump_generation("responses")
+                written = len(batch)
+            except Exception:
+                written = 0
+            with self._lock:
+                self._writing = 0
+                self.total_batches += 1
+                self.total_written += written
+                if not written:
+                    # Storage is unavailable; count the batch as dropped instead of retrying forever
+                    self.errors += 1
+
+_response_log = ResponseLog()
+atexit.register(_response_log.flush, 5)
+
+def get_response_log_stats():
+    """Buffer depth and write counts of the response log"""
+    return _response_log.stats()
 
 # Create necessary directories
 def ensure_directories():
     os.makedirs("data", exist_ok=True)
     os.makedirs("assets", exist_ok=True)
 
-# Initialize data files if they don't exist
-def initialize_data_files():
+# Default data for a fresh install
+def _default_users():
     from .auth import hash_password
     
     # Default admin user
-    if not os.path.exists(USER_DB_FILE):
-        default_users = {
-            "admin": {
-                "password": hash_password("admin123"),
-                "role": "admin",
-                "name": "Admin User"
-            }
+    return {
+        "admin": {
+            "password": hash_password("admin123"),
+            "role": "admin",
+            "name": "Admin User"
         }
-        with open(USER_DB_FILE, "w") as f:
-            json.dump(default_users, f)
-    
-    # Default questions
-    if not os.path.exists(QUESTIONS_FILE):
-        default_questions = [
-            {
-                "id": 1,
-                "question": "What should you do before operating a forklift?",
-                "options": [
-                    "Check fuel only", 
-                    "Full pre-shift inspection", 
-                    "Test horn", 
-                    "Load immediately"
-                ],
-                "answer": 1,
-                "explanation": "OSHA requires a pre-shift inspection for safety.",
-                "category": "Safety"
-            },
-            {
-                "id": 2,
-                "question": "What is the proper way to approach an intersection with a forklift?",
-                "options": [
-                    "Speed up to get through quickly", 
-                    "Honk and proceed without stopping", 
-                    "Slow down, honk, and look both ways", 
-                    "Always come to a complete stop"
-                ],
-                "answer": 2,
-                "explanation": "Slowing down, honking, and looking both ways ensures visibility and warns pedestrians of your approach.",
-                "category": "Operation"
-            },
-            {
-                "id": 3,
-                "question": "When parking a forklift at the end of a shift, you should:",
-                "options": [
-                    "Leave the forks raised for easy access next shift", 
-                    "Park anywhere convenient", 
-                    "Lower the forks to the ground, set the brake, and turn off the engine", 
-                    "Leave the key in the ignition for the next operator"
-                ],
-                "answer": 2,
-                "explanation": "Lowering forks, setting the brake, and turning off the engine are essential safety protocols for parking.",
-                "category": "Safety"
-            }
-        ]
-        with open(QUESTIONS_FILE, "w") as f:
-            json.dump(default_questions, f)
-    
-    # Empty scores file
-    if not os.path.exists(SCORES_FILE):
-        with open(SCORES_FILE, "w") as f:
-            json.dump([], f)
+    }
+
+def _default_questions():
+    return [
+        {
+            "id": 1,
+            "question": "What should you do before operating a forklift?",
+            "options": [
+                "Check fuel only", 
+                "Full pre-shift inspection", 
+                "Test horn", 
+                "Load immediately"
+            ],
+            "answer": 1,
+            "explanation": "OSHA requires a pre-shift inspection for safety.",
+            "category": "Safety"
+        },
+        {
+            "id": 2,
+            "question": "What is the proper way to approach an intersection with a forklift?",
+            "options": [
+                "Speed up to get through quickly", 
+                "Honk and proceed without stopping", 
+                "Slow down, honk, and look both ways", 
+                "Always come to a complete stop"
+            ],
+            "answer": 2,
+            "explanation": "Slowing down, honking, and looking both ways ensures visibility and warns pedestrians of your approach.",
+            "category": "Operation"
+        },
+        {
+            "id": 3,
+            "question": "When parking a forklift at the end of a shift, you should:",
+            "options": [
+                "Leave the forks raised for easy access next shift", 
+                "Park anywhere convenient", 
+                "Lower the forks to the ground, set the brake, and turn off the engine", 
+                "Leave the key in the ignition for the next operator"
+            ],
+            "answer": 2,
+            "explanation": "Lowering forks, setting the brake, and turning off the engine are essential safety protocols for parking.",
+            "category": "Safety"
+        }
+    ]
+
+# Initialize data files if they don't exist
+def initialize_data_files():
+    get_storage().initialize(_default_users, _default_questions)
 
 # Load data
+# The loaders return a fresh top-level dict/list, but the records inside are
+# shared with the cache: replace a record instead of editing it in place.
 def load_users():
-    """Load users from JSON file"""
-    if os.path.exists(USER_DB_FILE):
-        with open(USER_DB_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    """Load users from the user directory"""
+    return dict(_user_directory.snapshot())
+
+def get_user(username):
+    """Look up a single user, or None if it doesn't exist"""
+    storage = get_storage()
+    if storage.indexed:
+        return storage.get_user(username)
+    return _user_directory.get(username)
 
 def load_questions():
-    """Load questions from JSON file"""
-    if os.path.exists(QUESTIONS_FILE):
-        with open(QUESTIONS_FILE, "r") as f:
-            return json.load(f)
-    return []
+    """Load questions from storage"""
+    return list(_cached("questions", "questions", get_storage().load_questions))
 
-def load_scores():
-    """Load scores from JSON file"""
-    if os.path.exists(SCORES_FILE):
-        with open(SCORES_FILE, "r") as f:
-            return json.load(f)
-    return []
+def _timestamp_bound(value, end=False):
+    # Accept dates, datetimes or strings; a bare date covers the whole day
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        value = value.strftime("%Y-%m-%d")
+    if len(value) == 10:
+        return value + (" 23:59:59" if end else " 00:00:00")
+    return value
+
+def load_scores(start=None, end=None):
+    """Load quiz attempts from storage, optionally only those between start and end (inclusive)
+    
+    With a time range, only the score segments covering it are read.
+    """
+    if start is None and end is None:
+        return list(_cached("scores", "scores", get_storage().load_scores))
+    return get_storage().load_scores(_timestamp_bound(start), _timestamp_bound(end, end=True))
 
 def save_users(users):
-    """Save users to JSON file"""
-    with open(USER_DB_FILE, "w") as f:
-        json.dump(users, f)
+    """Save users to storage (replaces every user)"""
+    def replace_all(current):
+        current.clear()
+        current.update(users)
+    _commit_queue.submit("users", replace_all)
+
+def update_users(update):
+    """Apply update(users) to the latest users and save them, returning its result.
+    
+    Updates are applied one at a time by the writer thread, so concurrent
+    read-modify-write calls can't overwrite each other. The update should
+    validate before it changes anything, and replace user records rather
+    than editing them in place.
+    """
+    return _commit_queue.submit("users", update)
+
+def questions_version():
+    """Identifies the current question bank; changes whenever it is saved or edited on disk"""
+    return (_generations["questions"], get_storage().signature("questions"))
 
 def save_questions(questions):
-    """Save questions to JSON file"""
-    with open(QUESTIONS_FILE, "w") as f:
-        json.dump(questions, f)
+    """Save questions to storage"""
+    get_storage().save_questions(questions)
+    _bump_generation("questions")
+
+# Quiz blueprint: how many questions to draw from each category.
+# {"default_per_category": N, "per_category": {"Safety": n, ...}}; a missing
+# or 0 count means every question in that category (the whole bank by default).
+def load_quiz_blueprint():
+    """Load the quiz blueprint from JSON file"""
+    if os.path.exists(QUIZ_BLUEPRINT_FILE):
+        with open(QUIZ_BLUEPRINT_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+def save_quiz_blueprint(blueprint):
+    """Save the quiz blueprint to JSON file"""
+    # Replaced in one step, so a quiz starting meanwhile never reads a partial file
+    _atomic_write(QUIZ_BLUEPRINT_FILE, lambda f: json.dump(blueprint, f))
 
 def save_scores(scores):
-    """Save scores to JSON file"""
-    with open(SCORES_FILE, "w") as f:
-        json.dump(scores, f)
+    """Replace the whole score history (use append_score for new attempts)"""
+    _commit_queue.submit("scores_replace", list(scores))
+
+def append_score(score_data):
+    """Record one quiz attempt without rewriting the history"""
+    _commit_queue.submit("scores", score_data)
 
 # Score Functions
 def save_quiz_score(username, score, max_score):
-    scores = load_scores()
     score_data = {
         "username": username,
         "score": score,
@@ -127,9 +612,38 @@ def save_quiz_score(username, score, max_score):
         "percentage": (score / max_score) * 100,
         "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-    scores.append(score_data)
-    save_scores(scores)
+    append_score(score_data)
+    return score_data
+
+def record_response(username, attempt, question_id, chosen, correct, latency_ms):
+    """Record one answered question (written in the background)"""
+    _response_log.record({
+        "username": username,
+        "attempt": attempt,
+        "question_id": question_id,
+        "chosen": int(chosen),
+        "correct": bool(correct),
+        "latency_ms": int(latency_ms),
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    })
+
+def load_responses():
+    """Load every recorded response, after writing out any still buffered"""
+    _response_log.flush(timeout=5)
+    return list(_cached("responses", "responses", get_storage().load_responses))
+
+def read_responses(cursor=None, flush=True):
+    """Responses recorded since cursor, as (responses, new cursor, reset).
+    
+    Pass the returned cursor to the next call to get only newer responses;
+    reset is True when the result starts from the first response again.
+    With flush=False, responses still buffered in memory are left for a later
+    call instead of waiting for them to be written.
+    """
+    if flush:
+        _response_log.flush(timeout=5)
+    return get_storage().read_responses(cursor)
 
 def get_user_scores(username):
-    scores = load_scores()
-    return [s for s in scores if s["username"] == username]
\ No newline at end of file
+    """Load one user's attempts (served from a per-user index)"""
+    return get_storage().get_user_scores(username)
\ No newline at end of file
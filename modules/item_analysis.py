@@ -0,0 +1,242 @@
+import os
+import json
+import threading
+import numpy as np
+from .data_manager import ITEM_ANALYSIS_DIR, get_storage, read_responses
+
+# Item analysis over the response log. Responses are kept as a sparse
+# attempt x question matrix in coordinate form (one row index, column index,
+# correctness and chosen option per response), grown in place as new
+# responses are read, so an update only decodes the responses added since the
+# last one. The statistics are then a single vectorized pass over the matrix.
+#
+# The matrix is also kept on disk, the way analytics.py keeps its score
+# snapshot: one raw array file per column and a file of attempt ids, all
+# append-only, plus meta.json with the committed sizes and the response log
+# cursor. A new process loads it and reads only the responses recorded since,
+# instead of parsing the whole log.
+EASY_P_VALUE = 0.9  # Items answered correctly more often than this are flagged as too easy
+HARD_P_VALUE = 0.3  # ...and less often than this as too hard
+LOW_DISCRIMINATION = 0.2  # Point-biserial below this
+MIN_RESPONSES = 10  # Items with fewer responses aren't flagged
+COLUMNS = {
+    "rows": np.dtype("<i4"),
+    "cols": np.dtype("<i4"),
+    "correct": np.dtype("i1"),
+    "chosen": np.dtype("<i2"),
+}
+ATTEMPTS_FILE = "attempts.txt"  # Attempt id of each row, one per line
+META_FILE = "meta.json"
+
+class ResponseMatrix:
+    def __init__(self):
+        self.attempt_codes = {}  # Attempt id -> row
+        self.question_codes = {}  # Question id -> column
+        self.size = 0
+        self.rows = np.empty(0, dtype=np.int32)
+        self.cols = np.empty(0, dtype=np.int32)
+        self.correct = np.empty(0, dtype=np.int8)
+        self.chosen = np.empty(0, dtype=np.int16)
+        self.totals = np.empty(0, dtype=np.int32)  # Correct answers per attempt
+
+    @property
+    def question_ids(self):
+        return np.fromiter(self.question_codes, dtype=np.int64, count=len(self.question_codes))
+
+    def add(self, responses):
+        """Append responses to the matrix and update the attempt totals"""
+        count = len(responses)
+        if not count:
+            return
+        rows = np.fromiter(
+            (self.attempt_codes.setdefault(r["attempt"], len(self.attempt_codes)) for r in responses),
+            dtype=np.int32, count=count
+        )
+        cols = np.fromiter(
+            (self.question_codes.setdefault(r["question_id"], len(self.question_codes)) for r in responses),
+            dtype=np.int32, count=count
+        )
+        correct = np.fromiter((r["correct"] for r in responses), dtype=np.int8, count=count)
+        chosen = np.fromiter((r["chosen"] for r in responses), dtype=np.int16, count=count)
+
+        # Grow the columns geometrically so appends stay amortized O(new responses)
+        needed = self.size + count
+        if needed > len(self.rows):
+            capacity = max(needed, 2 * len(self.rows), 1024)
+            for name in ("rows", "cols", "correct", "chosen"):
+                grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+        self.rows[self.size:needed] = rows
+        self.cols[self.size:needed] = cols
+        self.correct[self.size:needed] = correct
+        self.chosen[self.size:needed] = chosen
+        self.size = needed
+
+        if len(self.attempt_codes) > len(self.totals):
+            self.totals = np.concatenate([self.totals, np.zeros(len(self.attempt_codes) - len(self.totals), dtype=np.int32)])
+        np.add.at(self.totals, rows, correct)
+
+    @classmethod
+    def from_columns(cls, attempts, question_ids, columns):
+        """A matrix over stored columns (the totals are recomputed from them)"""
+        matrix = cls()
+        matrix.attempt_codes = {attempt: code for code, attempt in enumerate(attempts)}
+        matrix.question_codes = {qid: code for code, qid in enumerate(question_ids)}
+        matrix.size = len(columns["rows"])
+        for name in COLUMNS:
+            setattr(matrix, name, columns[name])
+        matrix.totals = np.bincount(matrix.rows, weights=matrix.correct,
+                                    minlength=len(attempts)).astype(np.int32)
+        return matrix
+
+    def statistics(self):
+        """Per-question difficulty, discrimination and option counts"""
+        items = len(self.question_codes)
+        rows = self.rows[:self.size]
+        cols = self.cols[:self.size]
+        x = self.correct[:self.size].astype(np.float64)
+        chosen = self.chosen[:self.size]
+
+        # Rest score: the attempt's other correct answers (excludes the item itself)
+        y = self.totals[rows] - x
+        n = np.bincount(cols, minlength=items).astype(np.float64)
+        sum_x = np.bincount(cols, weights=x, minlength=items)
+        sum_y = np.bincount(cols, weights=y, minlength=items)
+        sum_yy = np.bincount(cols, weights=y * y, minlength=items)
+        sum_xy = np.bincount(cols, weights=x * y, minlength=items)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_value = sum_x / n
+            # Pearson correlation of a 0/1 item with the rest score (x * x == x)
+            spread = (n * sum_x - sum_x ** 2) * (n * sum_yy - sum_y ** 2)
+            discrimination = np.where(spread > 0, (n * sum_xy - sum_x * sum_y) / np.sqrt(spread), np.nan)
+
+        options = int(chosen.max()) + 1 if self.size else 0
+        option_counts = np.bincount(
+            cols.astype(np.int64) * options + chosen, minlength=items * options
+        ).reshape(items, options)
+
+        return {
+            "question_id": self.question_ids,
+            "responses": n.astype(np.int64),
+            "p_value": p_value,
+            "discrimination": discrimination,
+            "option_counts": option_counts,
+        }
+
+def flag_items(stats, answer_keys):
+    """Review flags per question; answer_keys maps question id -> correct option"""
+    keys = np.array([answer_keys.get(int(qid), -1) for qid in stats["question_id"]], dtype=np.int64)
+    counts = stats["option_counts"]
+    if len(keys) and keys.max() >= counts.shape[1]:
+        # The answer may be an option nobody has picked yet
+        counts = np.pad(counts, ((0, 0), (0, keys.max() + 1 - counts.shape[1])))
+    items = np.arange(len(keys))
+    known = keys >= 0
+    key_counts = np.where(known, counts[items, np.maximum(keys, 0)] if counts.size else 0, 0)
+    distractors = counts.copy()
+    distractors[items[known], keys[known]] = -1
+    top_distractor = distractors.max(axis=1, initial=-1)
+
+    flags = []
+    for i in items:
+        item_flags = []
+        if stats["responses"][i] >= MIN_RESPONSES:
+            if stats["p_value"][i] >= EASY_P_VALUE:
+                item_flags.append("Too easy")
+            elif stats["p_value"][i] <= HARD_P_VALUE:
+                item_flags.append("Too hard")
+            if stats["discrimination"][i] < LOW_DISCRIMINATION:
+                item_flags.append("Low discrimination")
+            if known[i] and top_distractor[i] > key_counts[i]:
+                item_flags.append("Distractor beats the answer")
+        flags.append(", ".join(item_flags))
+    return flags
+
+def _path(name):
+    return os.path.join(ITEM_ANALYSIS_DIR, name)
+
+def _read_meta():
+    try:
+        with open(_path(META_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _write_meta(meta):
+    tmp_path = _path(META_FILE) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, _path(META_FILE))
+
+def _load_matrix():
+    """(matrix, meta) from disk, or (empty matrix, None)"""
+    meta = _read_meta()
+    if not meta or meta.get("engine") != type(get_storage()).__name__:
+        return ResponseMatrix(), None
+    try:
+        # Only the committed part; a crash may have left more in the files
+        columns = {name: np.fromfile(_path(f"{name}.bin"), dtype=dtype, count=meta["size"])
+                   for name, dtype in COLUMNS.items()}
+        with open(_path(ATTEMPTS_FILE), "rb") as f:
+            attempts = f.read(meta["attempts_bytes"]).decode().splitlines()
+    except (FileNotFoundError, ValueError):
+        return ResponseMatrix(), None
+    if any(len(column) != meta["size"] for column in columns.values()):
+        return ResponseMatrix(), None
+    return ResponseMatrix.from_columns(attempts, meta["questions"], columns), meta
+
+def _save_matrix(matrix, cursor, meta):
+    """Append the rows and attempts added since meta (None rewrites everything); returns the new meta"""
+    os.makedirs(ITEM_ANALYSIS_DIR, exist_ok=True)
+    size = meta["size"] if meta else 0
+    attempt_count = meta["attempts"] if meta else 0
+    attempts_bytes = meta["attempts_bytes"] if meta else 0
+    new_attempts = "".join(f"{attempt}\n" for attempt in list(matrix.attempt_codes)[attempt_count:]).encode()
+
+    files = [(f"{name}.bin", getattr(matrix, name)[size:matrix.size].tobytes(), size * dtype.itemsize)
+             for name, dtype in COLUMNS.items()]
+    files.append((ATTEMPTS_FILE, new_attempts, attempts_bytes))
+    for name, data, committed in files:
+        if meta:
+            with open(_path(name), "ab") as f:
+                # Drop anything past the committed part (left by a crash before meta was written)
+                f.truncate(committed)
+                f.write(data)
+        else:
+            with open(_path(name) + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(_path(name) + ".tmp", _path(name))
+    meta = {
+        "size": matrix.size,
+        "attempts": len(matrix.attempt_codes),
+        "attempts_bytes": attempts_bytes + len(new_attempts),
+        "questions": [int(qid) for qid in matrix.question_codes],
+        "engine": type(get_storage()).__name__,
+        "cursor": cursor,
+    }
+    _write_meta(meta)
+    return meta
+
+_lock = threading.Lock()
+_current = {"cursor": None, "matrix": None, "meta": None, "stats": None}
+
+def get_item_statistics(flush=True):
+    """Item statistics over every recorded response, updated with new responses
+    (flush=False skips responses not yet written by the background writer)"""
+    with _lock:
+        if _current["matrix"] is None:
+            _current["matrix"], _current["meta"] = _load_matrix()
+            _current["cursor"] = _current["meta"]["cursor"] if _current["meta"] else None
+        responses, cursor, reset = read_responses(_current["cursor"], flush=flush)
+        stale = reset and _current["meta"] is not None
+        if reset:
+            _current["matrix"], _current["meta"] = ResponseMatrix(), None
+        if responses or stale:
+            _current["matrix"].add(responses)
+            _current["meta"] = _save_matrix(_current["matrix"], cursor, _current["meta"])
+        if reset or responses or _current["stats"] is None:
+            _current["stats"] = _current["matrix"].statistics()
+        _current["cursor"] = cursor
+        return _current["stats"]
@@ -7,8 +7,10 @@ def navigate_to(page):
     if page != "quiz":
         if "current_question" in st.session_state:
             del st.session_state.current_question
-        if "score" in st.session_state:
-            del st.session_state.score
+        if "quiz_answers" in st.session_state:
+            del st.session_state.quiz_answers
+        if "quiz_correct" in st.session_state:
+            del st.session_state.quiz_correct
         if "answered" in st.session_state:
             del st.session_state.answered
         if "quiz_complete" in st.session_state:
@@ -1,12 +1,22 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import os
-from ..ui import load_css, display_logo
+import datetime
+from ..ui import display_logo
 from ..data_manager import (
-    load_questions, load_scores, load_users, 
-    save_questions, save_users, LOGO_PATH
+    load_questions, load_users, 
+    save_questions, update_users, get_score_aggregates,
+    load_quiz_blueprint, save_quiz_blueprint,
+    SCORE_BINS, SCORE_BIN_LABELS, LOGO_PATH
 )
-from ..auth import hash_password
+from ..auth import hash_password, add_user, parse_user_import, bulk_add_users
+from ..analytics import get_score_columns
+from ..item_analysis import get_item_statistics, flag_items, MIN_RESPONSES
+from ..adaptive import MIN_QUESTIONS as ADAPTIVE_MIN_QUESTIONS, MAX_QUESTIONS as ADAPTIVE_MAX_QUESTIONS, MIN_CALIBRATED_SHARE, calibration_status
+from ..question_bank import get_question_bank, live_bank_versions, blueprint_counts
+from ..certificate_batch import passing_attempts, build_certificate_archive
+from ..certificate import pdf_can_show
 
 # Helper function for removing users
 def remove_user_section():
@@ -38,23 +48,19 @@ def remove_user_section():
                 
                 if submit_button:
                     # Remove the user
-                    del users[username_to_remove]
-                    save_users(users)
+                    update_users(lambda current: current.pop(username_to_remove, None))
                     st.success(f"User '{username_to_remove}' has been removed.")
                     return True
     
     return False
 
 def admin_page():
-    # Apply custom CSS
-    st.markdown(load_css(), unsafe_allow_html=True)
-    
     # Display logo
     display_logo()
     
     st.title("Admin Panel")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["Manage Questions", "View User Scores", "Manage Users", "Branding"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Manage Questions", "View User Scores", "Item Analysis", "Manage Users", "Branding"])
     
     with tab1:
         st.subheader("Question Management")
@@ -198,11 +204,15 @@ def admin_page():
                 submit_edit = st.form_submit_button("Save Changes")
                 
                 if submit_edit:
-                    questions[selected_q_idx]["question"] = edited_question
-                    questions[selected_q_idx]["options"] = edited_options
-                    questions[selected_q_idx]["answer"] = edited_answer
-                    questions[selected_q_idx]["explanation"] = edited_explanation
-                    questions[selected_q_idx]["category"] = edited_category
+                    # Replace the question rather than editing the cached copy in place
+                    questions[selected_q_idx] = {
+                        **q_to_edit,
+                        "question": edited_question,
+                        "options": edited_options,
+                        "answer": edited_answer,
+                        "explanation": edited_explanation,
+                        "category": edited_category
+                    }
                     
                     save_questions(questions)
                     st.success("Question updated successfully!")
@@ -256,43 +266,76 @@ def admin_page():
                     save_questions(questions)
                     st.success("New question added successfully!")
         st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Quiz blueprint
+        st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+        st.markdown("### Quiz Blueprint")
+        st.write("Choose how many questions each quiz draws from every category (use 0 to include every question in that category), or switch to adaptive quizzes.")
+        bank = get_question_bank()
+        category_index = bank.by_category
+        st.caption(f"Question bank version {bank.number} (versions in memory: {', '.join(map(str, live_bank_versions()))})")
+        if category_index:
+            blueprint = load_quiz_blueprint()
+            per_category = blueprint.get("per_category", {})
+            if blueprint.get("mode") == "adaptive":
+                calibrated, total = calibration_status(bank)
+                if calibrated < MIN_CALIBRATED_SHARE * total:
+                    st.warning(f"Only {calibrated} of {total} questions have enough answers to calibrate adaptive quizzes "
+                               f"({MIN_CALIBRATED_SHARE:.0%} needed). Quizzes use the fixed blueprint until then.")
+            default_count = blueprint.get("default_per_category") or 0
+            
+            with st.form(key="quiz_blueprint_form"):
+                quiz_modes = {"fixed": "Fixed (questions per category below)", "adaptive": "Adaptive (stops once the operator's level is clear)"}
+                new_mode = st.selectbox(
+                    "Quiz mode",
+                    options=list(quiz_modes),
+                    format_func=quiz_modes.get,
+                    index=list(quiz_modes).index(blueprint.get("mode", "fixed")),
+                    key="blueprint_mode"
+                )
+                new_counts = {}
+                for category, category_questions in sorted(category_index.items()):
+                    new_counts[category] = st.number_input(
+                        f"{category} ({len(category_questions)} available)",
+                        min_value=0,
+                        max_value=len(category_questions),
+                        value=min(per_category.get(category, default_count), len(category_questions)),
+                        step=1,
+                        key=f"blueprint_{category}"
+                    )
+                
+                if st.form_submit_button("Save Blueprint"):
+                    save_quiz_blueprint({**blueprint, "mode": new_mode, "per_category": new_counts})
+                    if new_mode == "adaptive":
+                        st.success(f"Quizzes will now ask between {min(ADAPTIVE_MIN_QUESTIONS, len(bank))} and {min(ADAPTIVE_MAX_QUESTIONS, len(bank))} questions.")
+                    else:
+                        st.success(f"Quizzes will now have {sum(blueprint_counts({'per_category': new_counts}, category_index).values())} questions.")
+        else:
+            st.info("Add questions to configure the quiz blueprint.")
+        st.markdown('</div>', unsafe_allow_html=True)
     
     with tab2:
         st.subheader("User Scores")
         
-        # Load all scores
-        all_scores = load_scores()
+        # Running totals kept up to date by every saved score
+        aggregates = get_score_aggregates()
         users = load_users()
         
-        if not all_scores:
+        if not aggregates["count"]:
             st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
             st.info("No quiz scores recorded yet.")
             st.markdown('</div>', unsafe_allow_html=True)
         else:
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(all_scores)
-            
-            # Add name column
-            df["name"] = df["username"].apply(lambda u: users.get(u, {}).get("name", "Unknown"))
-            
             # Summary stats
             st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
             st.markdown("### Overall Statistics")
-            avg_score = df["percentage"].mean()
-            st.metric("Average Score", f"{avg_score:.1f}%")
+            st.metric("Average Score", f"{aggregates['mean']:.1f}%")
             
             # Score distribution
             st.markdown("### Score Distribution")
-            # Create bins for score ranges
-            bins = [0, 20, 40, 60, 80, 100]
-            labels = ["0-20%", "21-40%", "41-60%", "61-80%", "81-100%"]
-            df["score_range"] = pd.cut(df["percentage"], bins=bins, labels=labels, include_lowest=True)
-            
-            # Count occurrences in each bin and convert to a format Streamlit can display
-            score_distribution = df["score_range"].value_counts().sort_index()
             score_distribution_df = pd.DataFrame({
-                "Score Range": score_distribution.index,
-                "Count": score_distribution.values
+                "Score Range": list(aggregates["bins"].keys()),
+                "Count": list(aggregates["bins"].values())
             })
             st.bar_chart(score_distribution_df.set_index("Score Range"))
             st.markdown('</div>', unsafe_allow_html=True)
@@ -300,10 +343,22 @@ def admin_page():
             # Bar chart of average scores by user
             st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
             st.markdown("### Average Scores by User")
-            user_avg = df.groupby("name")["percentage"].mean().reset_index()
-            st.bar_chart(user_avg.set_index("name"))
+            user_avg = pd.DataFrame([
+                {"name": users.get(username, {}).get("name", "Unknown"), "percentage": stats["total"], "count": stats["count"]}
+                for username, stats in aggregates["per_user"].items()
+            ])
+            # Users sharing a display name are combined, as before
+            user_avg = user_avg.groupby("name")[["percentage", "count"]].sum()
+            user_avg["percentage"] = user_avg["percentage"] / user_avg["count"]
+            st.bar_chart(user_avg[["percentage"]])
             st.markdown('</div>', unsafe_allow_html=True)
             
+            # Full history for the export and the table, from the columnar snapshot
+            columns = get_score_columns()
+            names = {username: info["name"] for username, info in users.items()}
+            df = columns.to_frame(names)
+            df["score_range"] = pd.cut(columns.percentage, bins=[0] + SCORE_BINS, labels=SCORE_BIN_LABELS, include_lowest=True)
+            
             # Export scores to CSV
             st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
             st.markdown("### Export All Scores")
@@ -324,8 +379,109 @@ def admin_page():
                 use_container_width=True
             )
             st.markdown('</div>', unsafe_allow_html=True)
-    
+
+            # Certificates for every passing attempt in a date range
+            st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+            st.markdown("### Batch Certificates")
+            today = datetime.date.today()
+            date_range = st.date_input("Attempts between", value=(today - datetime.timedelta(days=30), today), key="certificate_batch_range")
+            certificate_format = st.radio("Format", ["pdf", "html"], format_func=str.upper, horizontal=True, key="certificate_batch_format")
+
+            if st.button("Build Certificate Archive", key="certificate_batch_btn"):
+                if len(date_range) != 2:
+                    st.error("Choose a start and end date.")
+                else:
+                    attempts = passing_attempts(*date_range)
+                    if not attempts:
+                        st.info("No passing attempts in that range.")
+                    else:
+                        if certificate_format == "pdf":
+                            unshowable = sum(not pdf_can_show(attempt["name"]) for attempt in attempts)
+                            if unshowable:
+                                st.warning(f"{unshowable} certificates are for names with characters PDF certificates can't show; "
+                                           "they are included as HTML.")
+                        progress_bar = st.progress(0.0, text="Rendering certificates...")
+                        path = build_certificate_archive(
+                            attempts, certificate_format,
+                            progress=lambda done, total: progress_bar.progress(done / total, text=f"Rendering certificates... {done}/{total}")
+                        )
+                        progress_bar.empty()
+
+                        # Keep one archive per session
+                        previous = st.session_state.get("certificate_archive")
+                        if previous and os.path.exists(previous["path"]):
+                            os.remove(previous["path"])
+                        st.session_state.certificate_archive = {
+                            "path": path,
+                            "count": len(attempts),
+                            "file_name": f"certificates_{date_range[0]:%Y%m%d}-{date_range[1]:%Y%m%d}.zip"
+                        }
+
+            archive = st.session_state.get("certificate_archive")
+            if archive and os.path.exists(archive["path"]):
+                st.caption(f"{archive['count']} certificates ready.")
+                with open(archive["path"], "rb") as f:
+                    st.download_button(
+                        label="Download Certificate Archive",
+                        data=f,
+                        file_name=archive["file_name"],
+                        mime="application/zip",
+                        key="certificate_archive_download_btn",
+                        on_click="ignore"
+                    )
+            st.markdown('</div>', unsafe_allow_html=True)
+
     with tab3:
+        st.subheader("Item Analysis")
+        
+        # st.tabs runs every tab on every rerun, so the statistics are only
+        # loaded once the admin asks for them
+        if not st.toggle("Show item analysis", key="item_analysis_open"):
+            st.caption("Per-question difficulty, discrimination and answer choices from every recorded answer.")
+        else:
+            # Per-question statistics from every recorded answer
+            item_stats = get_item_statistics()
+        
+            st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+            if not len(item_stats["question_id"]):
+                st.info("No answers recorded yet.")
+            else:
+                bank = get_question_bank()
+                answer_keys = {qid: question.answer for qid, question in bank.questions.items()}
+                option_counts = item_stats["option_counts"]
+                # Show every option of the bank, even ones nobody has chosen yet
+                option_width = max([option_counts.shape[1]] + [len(q.options) for q in bank.questions.values()])
+                option_counts = np.pad(option_counts, ((0, 0), (0, option_width - option_counts.shape[1])))
+                responses = np.maximum(item_stats["responses"], 1)
+            
+                item_df = pd.DataFrame({
+                    "ID": item_stats["question_id"],
+                    "Question": [bank.questions[qid].question if qid in bank.questions else "(no longer in the bank)"
+                                 for qid in item_stats["question_id"].tolist()],
+                    "Category": [bank.questions[qid].category if qid in bank.questions else ""
+                                 for qid in item_stats["question_id"].tolist()],
+                    "Responses": item_stats["responses"],
+                    "Difficulty (p)": item_stats["p_value"].round(3),
+                    "Discrimination": item_stats["discrimination"].round(3),
+                    "Flags": flag_items(item_stats, answer_keys),
+                })
+                # Share of responses choosing each option (answer options are 1-based here)
+                for option in range(option_counts.shape[1]):
+                    item_df[f"Option {option + 1} %"] = (option_counts[:, option] / responses * 100).round(1)
+            
+                st.markdown(f"**{int(item_stats['responses'].sum()):,} answers to {len(item_df)} questions**")
+                st.caption(
+                    "Difficulty is the share of correct answers; discrimination is the point-biserial "
+                    "correlation between answering correctly and the rest of the attempt's score. "
+                    f"Questions with fewer than {MIN_RESPONSES} answers aren't flagged."
+                )
+                flagged_only = st.checkbox("Only show flagged questions", key="item_analysis_flagged")
+                if flagged_only:
+                    item_df = item_df[item_df["Flags"] != ""]
+                st.dataframe(item_df.sort_values("Difficulty (p)"), use_container_width=True, hide_index=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    with tab4:
         st.subheader("User Management")
         
         # Load users
@@ -360,16 +516,53 @@ def admin_page():
             if submit_user:
                 if not new_username or not new_password or not new_name:
                     st.error("All fields are required")
-                elif new_username in users:
-                    st.error("Username already exists")
                 else:
-                    users[new_username] = {
-                        "password": hash_password(new_password),
-                        "name": new_name,
-                        "role": new_role
-                    }
-                    save_users(users)
-                    st.success(f"User {new_username} added successfully!")
+                    success, message = add_user(new_username, new_password, new_name, new_role)
+                    if success:
+                        st.success(f"User {new_username} added successfully!")
+                    else:
+                        st.error(message)
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Bulk import users
+        st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+        st.markdown("### Bulk Import Users")
+        st.write("Upload a CSV or JSON file of users. CSV files need these columns: username, password, name, role (operator or admin, optional)")
+        
+        sample_users_csv = pd.DataFrame([
+            {"username": "jdoe", "password": "ChangeMe123", "name": "Jane Doe", "role": "operator"}
+        ]).to_csv(index=False)
+        st.download_button(
+            label="Download Sample Users CSV",
+            data=sample_users_csv,
+            file_name="sample_users.csv",
+            mime="text/csv"
+        )
+        
+        uploaded_users = st.file_uploader("Choose a CSV or JSON file", type=["csv", "json"], key="bulk_users_upload")
+        if uploaded_users is not None:
+            try:
+                records = parse_user_import(uploaded_users.getvalue(), uploaded_users.name)
+                st.write(f"{len(records)} user records found.")
+                
+                if st.button("Import Users", key="import_users_btn"):
+                    progress_bar = st.progress(0.0, text="Hashing passwords...")
+                    added, rejected = bulk_add_users(
+                        records,
+                        progress=lambda done, total: progress_bar.progress(done / total, text=f"Hashing passwords... {done}/{total}")
+                    )
+                    progress_bar.empty()
+                    
+                    if added:
+                        st.success(f"Successfully added {len(added)} users!")
+                    if rejected:
+                        st.warning(f"{len(rejected)} records were skipped:")
+                        st.dataframe(
+                            pd.DataFrame(rejected, columns=["row", "username", "reason"]),
+                            use_container_width=True
+                        )
+            except Exception as e:
+                st.error(f"Error processing user file: {e}")
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Reset user password
@@ -390,8 +583,16 @@ def admin_page():
                     elif new_password != confirm_password:
                         st.error("Passwords do not match")
                     else:
-                        users[username_to_reset]["password"] = hash_password(new_password)
-                        save_users(users)
+                        password_hash = hash_password(new_password)
+                        
+                        def reset_password(current):
+                            if username_to_reset in current:
+                                current[username_to_reset] = {
+                                    **current[username_to_reset],
+                                    "password": password_hash
+                                }
+                        
+                        update_users(reset_password)
                         st.success(f"Password for {username_to_reset} has been reset")
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -402,7 +603,7 @@ def admin_page():
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
     
-    with tab4:
+    with tab5:
         st.subheader("Company Branding")
         
         st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
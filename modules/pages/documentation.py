@@ -1,5 +1,5 @@
 import streamlit as st
-from ..ui import load_css, display_logo
+from ..ui import display_logo
 
 def documentation_page():
     # Security check - only allow admins to view documentation
@@ -8,9 +8,6 @@ def documentation_page():
         st.button("Return to Quiz", on_click=lambda: navigate_to("quiz"))
         return
 
-    # Apply custom CSS
-    st.markdown(load_css(), unsafe_allow_html=True)
-    
     # Display logo
     display_logo()
     
@@ -50,6 +47,13 @@ def documentation_page():
         6. Click "Next Question" to proceed
         7. After completing all questions, view your score
         8. Download a certificate if you achieved a passing score (80% or higher)
+        9. Download a certificate again at any time from "View My Scores"
+        
+        Every certificate carries a Certificate ID. Anyone signed in can check it under
+        "Verify Certificate", by entering the ID or uploading the certificate file.
+        
+        Your progress is saved after every answer. If you lose your connection or
+        the app restarts, log in again and click "Resume Quiz" to continue where you left off.
         """)
         
         st.markdown("### Viewing Scores")
@@ -92,6 +96,12 @@ def documentation_page():
             5. **Exporting Questions**:
                - Click "Download All Questions as CSV"
                - Save the file to your computer
+
+            6. **Quiz Blueprint**:
+               - Under "Quiz Blueprint", set how many questions each quiz draws from every category
+               - Use 0 to include every question in a category
+               - Set "Quiz mode" to Adaptive to pick each question based on the previous answers; the quiz stops as soon as the operator's level is clear and reports their expected score on the whole bank. Until 90% of the questions have been answered often enough to calibrate them, quizzes use the fixed blueprint instead
+               - Click "Save Blueprint"; new quizzes use it right away
             """)
             
             st.markdown("### Managing Users")
@@ -103,6 +113,7 @@ def documentation_page():
             2. **Adding Users**:
                - Fill in username, password, name, and role
                - Click "Add User" to create
+               - To add many users at once, upload a CSV or JSON file under "Bulk Import Users"
 
             3. **Resetting Passwords**:
                - Select a user from the dropdown
@@ -122,6 +133,14 @@ def documentation_page():
                - View overall statistics and visualizations
                - Export all scores to CSV if needed
                - Review the detailed score history table
+               - Under "Batch Certificates", choose a date range and format, then build and download a zip with a certificate for every passing attempt (plus an index.csv listing them)
+            
+            2. **Item Analysis**:
+               - Navigate to "Item Analysis" tab
+               - Difficulty is the share of operators answering a question correctly
+               - Discrimination shows whether stronger operators answer it correctly more often
+               - Option percentages show how often each answer is picked
+               - Flagged questions are too easy, too hard, poorly discriminating, or have a wrong option picked more often than the right one
             """)
             
             st.markdown("### Customizing Branding")
@@ -139,12 +158,13 @@ def documentation_page():
         1. **Authentication System**
            - User registration and login
            - Role-based access control (admin vs. operator)
-           - Password hashing for security
+           - Salted PBKDF2 password hashing (older hashes are upgraded at login)
 
         2. **Quiz Module**
            - Multiple-choice questions on forklift safety
            - Randomized question ordering
            - Immediate feedback with explanations
+           - Progress saved after every answer, with resume after a disconnect
            - Pass/fail scoring with certificate generation
 
         3. **Score Tracking**
@@ -156,6 +176,7 @@ def documentation_page():
            - Question management (add, edit, import/export)
            - User management (add, reset passwords, remove)
            - Score analytics and reporting
+           - Item analysis of every question
            - Company branding customization
 
         5. **Professional Certificates**
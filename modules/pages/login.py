@@ -1,11 +1,8 @@
 import streamlit as st
-from ..ui import load_css, display_logo, navigate_to
+from ..ui import display_logo, navigate_to, clear_quiz_state
 from ..auth import authenticate, add_user
 
 def login_page():
-    # Apply custom CSS
-    st.markdown(load_css(), unsafe_allow_html=True)
-    
     # Display logo
     display_logo()
     
@@ -26,6 +23,7 @@ def login_page():
             if st.button("Login", key="login_button"):
                 is_authenticated, role, name = authenticate(username, password)
                 if is_authenticated:
+                    clear_quiz_state()
                     st.session_state.authenticated = True
                     st.session_state.username = username
                     st.session_state.role = role
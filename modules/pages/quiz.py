@@ -1,90 +1,216 @@
 import streamlit as st
-import random
-import base64
-import datetime
-from modules.ui import load_css, display_logo  # For CSS and logo display
-from modules.data_manager import load_questions, save_quiz_score  # For quiz data and score saving
+import time
+import uuid
+from modules.ui import display_logo  # For logo display
+from modules.data_manager import save_quiz_score, record_response, load_quiz_blueprint  # For scores, answers and quiz settings
+from modules.question_bank import draw_quiz_question_ids, get_question_bank  # For quiz questions
+from modules import adaptive  # For adaptive quizzes
 from modules.navigation import navigate_to  # For page navigation
-from modules.certificate import create_certificate  # For certificate generation
+from modules.certificate import PASSING_PERCENTAGE, pdf_can_show  # For the pass mark and PDF certificates
+from modules.certificate_store import issue_certificate  # For certificates (rendered once, then served from the store)
+from modules.checkpoints import (  # For resuming interrupted quizzes
+    start_checkpoint, checkpoint_answer, checkpoint_question, complete_checkpoint, clear_checkpoint, load_checkpoint
+)
 
 
 
-def quiz_page():
-    # Apply custom CSS
-    st.markdown(load_css(), unsafe_allow_html=True)
+def _resume_quiz(checkpoint, bank):
+    """Restore an interrupted attempt from its checkpoint"""
+    question_ids = checkpoint["question_ids"]
+    answers = checkpoint["answers"]
+    st.session_state.quiz_bank = bank
+    st.session_state.quiz_adaptive = checkpoint["adaptive"]
+    st.session_state.quiz_question_ids = question_ids
+    if checkpoint["adaptive"]:
+        # Replay the answers to recover the ability estimate
+        pool = adaptive.get_item_pool(bank)
+        ability = adaptive.start_ability()
+        for index, _, correct in answers:
+            ability = adaptive.update_ability(pool, ability, question_ids[index], correct)
+        st.session_state.quiz_ability = ability
+        max_questions = max(min(adaptive.MAX_QUESTIONS, len(pool)), len(question_ids))
+    else:
+        max_questions = len(question_ids)
+    
+    st.session_state.quiz_answers = bytearray(max_questions)
+    st.session_state.quiz_correct = bytearray((max_questions + 7) // 8)
+    for index, chosen, correct in answers:
+        st.session_state.quiz_answers[index] = chosen + 1
+        if correct:
+            st.session_state.quiz_correct[index // 8] |= 1 << (index % 8)
     
+    # Continue at the first unanswered question (or after the last answer)
+    st.session_state.current_question = min(len(answers), len(question_ids) - 1)
+    st.session_state.answered = len(answers) >= len(question_ids)
+    st.session_state.quiz_attempt = checkpoint["attempt"]
+    st.session_state.question_shown_at = time.monotonic()
+    st.session_state.quiz_complete = False
+    st.session_state.quiz_in_progress = True
+
+def quiz_page():
     # Display logo
     display_logo()
     
     st.title("Forklift Operator Safety Quiz")
     
-    # Load all questions
-    all_questions = load_questions()
+    # Offer to resume an attempt cut short by a dropped connection or a restart
+    if 'quiz_question_ids' not in st.session_state:
+        checkpoint = load_checkpoint(st.session_state.username)
+        if checkpoint is not None:
+            bank = get_question_bank()
+            if not checkpoint["question_ids"] or any(qid not in bank.questions for qid in checkpoint["question_ids"]):
+                # Its questions have been removed since, so it can't be resumed
+                clear_checkpoint(st.session_state.username)
+            else:
+                st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+                answered = len(checkpoint["answers"])
+                st.info(f"You have an unfinished quiz from {checkpoint['started']} "
+                        f"({answered} question{'' if answered == 1 else 's'} answered).")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("Resume Quiz", key="resume_quiz_btn"):
+                        _resume_quiz(checkpoint, bank)
+                        st.rerun()
+                with col2:
+                    if st.button("Start New Quiz", key="discard_quiz_btn"):
+                        clear_checkpoint(st.session_state.username)
+                        st.rerun()
+                st.markdown('</div>', unsafe_allow_html=True)
+                return
     
     # Initialize quiz with randomized questions
-    if 'quiz_questions' not in st.session_state:
-        # Create a copy of the questions and shuffle them
-        import random
-        quiz_questions = all_questions.copy()
-        random.shuffle(quiz_questions)
-        st.session_state.quiz_questions = quiz_questions
+    if 'quiz_question_ids' not in st.session_state:
+        # Pin the latest question bank for this quiz, so admin edits made
+        # meanwhile only apply to quizzes started afterwards
+        st.session_state.quiz_bank = get_question_bank()
+        blueprint = load_quiz_blueprint()
+        # Adaptive quizzes fall back to fixed ones until the bank is calibrated
+        st.session_state.quiz_adaptive = (blueprint.get("mode") == "adaptive"
+                                          and adaptive.adaptive_ready(st.session_state.quiz_bank))
+        if st.session_state.quiz_adaptive:
+            # Questions are picked one at a time as the quiz goes
+            st.session_state.quiz_question_ids = ()
+        else:
+            # Draw this session's questions following the quiz blueprint
+            st.session_state.quiz_question_ids = draw_quiz_question_ids(blueprint, bank=st.session_state.quiz_bank)
     
-    # Use the randomized questions
-    quiz_questions = st.session_state.quiz_questions
+    # The session only holds question ids; content comes from the pinned bank
+    question_table = st.session_state.quiz_bank.questions
+    is_adaptive = st.session_state.quiz_adaptive
+    pool = adaptive.get_item_pool(st.session_state.quiz_bank) if is_adaptive else None
     
     # Initialize session state for tracking quiz progress
     if 'current_question' not in st.session_state:
         st.session_state.current_question = 0
-        st.session_state.score = 0
+        if is_adaptive:
+            # Start from the prior with the most informative first question
+            st.session_state.quiz_ability = adaptive.start_ability()
+            first_question = adaptive.next_question_id(pool, st.session_state.quiz_ability, ())
+            st.session_state.quiz_question_ids = (first_question,) if first_question is not None else ()
+            max_questions = min(adaptive.MAX_QUESTIONS, len(pool))
+        else:
+            max_questions = len(st.session_state.quiz_question_ids)
+        # Chosen option + 1 per question (0 = not answered yet)
+        st.session_state.quiz_answers = bytearray(max_questions)
+        # One bit per question, set when it was answered correctly
+        st.session_state.quiz_correct = bytearray((max_questions + 7) // 8)
+        # Groups this attempt's responses in the response log
+        st.session_state.quiz_attempt = uuid.uuid4().hex
+        st.session_state.question_shown_at = time.monotonic()
+        start_checkpoint(
+            st.session_state.username,
+            st.session_state.quiz_attempt,
+            is_adaptive,
+            st.session_state.quiz_question_ids
+        )
         st.session_state.answered = False
         st.session_state.quiz_complete = False
         st.session_state.quiz_in_progress = True
 
+    # The question card reruns on its own (see question_card below), so these
+    # helpers read the question ids from the session rather than from this run
+    
+    # Number of correct answers so far
+    def current_score():
+        return sum(byte.bit_count() for byte in st.session_state.quiz_correct)
+    
+    # Final (score, max_score); adaptive quizzes report the expected score on the whole bank
+    def quiz_result():
+        if is_adaptive:
+            return adaptive.adaptive_score(pool, st.session_state.quiz_ability)
+        return current_score(), len(st.session_state.quiz_question_ids)
+
     # Function to handle answer submission
     def check_answer(selected_option, question_idx):
-        correct_answer = quiz_questions[question_idx]["answer"]
-        if selected_option == correct_answer:
-            st.session_state.score += 1
-            return True
-        return False
+        question_ids = st.session_state.quiz_question_ids
+        st.session_state.quiz_answers[question_idx] = selected_option + 1
+        correct_answer = question_table[question_ids[question_idx]].answer
+        is_correct = selected_option == correct_answer
+        if is_correct:
+            st.session_state.quiz_correct[question_idx // 8] |= 1 << (question_idx % 8)
+        if is_adaptive:
+            st.session_state.quiz_ability = adaptive.update_ability(
+                pool, st.session_state.quiz_ability, question_ids[question_idx], is_correct
+            )
+        checkpoint_answer(st.session_state.username, question_idx, selected_option, is_correct)
+        
+        # Log the response for item analysis (buffered, doesn't wait for the disk)
+        record_response(
+            st.session_state.username,
+            st.session_state.quiz_attempt,
+            question_ids[question_idx],
+            selected_option,
+            is_correct,
+            int((time.monotonic() - st.session_state.question_shown_at) * 1000)
+        )
+        return is_correct
 
     # Function to go to next question
     def next_question():
-        if st.session_state.current_question < len(quiz_questions) - 1:
+        question_ids = st.session_state.quiz_question_ids
+        if is_adaptive:
+            # Ask the most informative remaining question until the estimate is precise enough
+            next_id = adaptive.next_question_id(pool, st.session_state.quiz_ability, question_ids)
+            if next_id is not None:
+                st.session_state.quiz_question_ids = question_ids + (next_id,)
+                checkpoint_question(st.session_state.username, next_id)
+        if st.session_state.current_question < len(st.session_state.quiz_question_ids) - 1:
             st.session_state.current_question += 1
+            st.session_state.question_shown_at = time.monotonic()
             st.session_state.answered = False
         else:
             st.session_state.quiz_complete = True
             st.session_state.quiz_in_progress = False
             
-            # Save the score when quiz is complete
-            score = st.session_state.score
-            max_score = len(quiz_questions)
-            save_quiz_score(st.session_state.username, score, max_score)
+            # Save the score when quiz is complete, marking the checkpoint first so it can't be resumed and saved again
+            score, max_score = quiz_result()
+            complete_checkpoint(st.session_state.username)
+            st.session_state.quiz_score_record = save_quiz_score(st.session_state.username, score, max_score)
+            clear_checkpoint(st.session_state.username)
 
     # Function to restart quiz
     def restart_quiz():
-        st.session_state.current_question = 0
-        st.session_state.score = 0
+        # Removing the cursor and question ids starts a new random set on the next run
+        for key in ("current_question", "quiz_question_ids", "quiz_bank", "quiz_adaptive", "quiz_ability",
+                    "quiz_answers", "quiz_correct", "quiz_score_record"):
+            if key in st.session_state:
+                del st.session_state[key]
         st.session_state.answered = False
         st.session_state.quiz_complete = False
         st.session_state.quiz_in_progress = True
-        
-        # Remove quiz_questions to get a new random set on restart
-        if 'quiz_questions' in st.session_state:
-            del st.session_state.quiz_questions
 
     # Display quiz completion screen
     if st.session_state.quiz_complete:
-        score = st.session_state.score
-        max_score = len(quiz_questions)
+        score, max_score = quiz_result()
         percentage = (score / max_score) * 100
         
         st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
         st.success(f"Quiz complete! Your score: {score}/{max_score} ({percentage:.1f}%)")
+        if is_adaptive:
+            st.caption(f"Adaptive quiz: estimated from your {len(st.session_state.quiz_question_ids)} answers.")
         
         # Show recommendation based on score
-        if percentage >= 80:
+        if percentage >= PASSING_PERCENTAGE:
             st.balloons()
             st.markdown("### Great job! You have a solid understanding of forklift safety.")
             
@@ -92,15 +218,35 @@ def quiz_page():
             st.markdown("### Certificate of Completion")
             st.markdown('<div class="certificate-container">', unsafe_allow_html=True)
             
-            cert_html = create_certificate(
-                st.session_state.name, 
-                f"{percentage:.1f}", 
-                datetime.datetime.now().strftime("%B %d, %Y")
-            )
+            # Issued once per attempt; later reruns read it back from the certificate store
+            record = st.session_state.quiz_score_record
+            certificate_id, html_certificate = issue_certificate(record, st.session_state.name, "html")
+            st.caption(f"Certificate ID: {certificate_id}")
             
-            b64 = base64.b64encode(cert_html.encode()).decode()
-            download_button = f'<a href="data:text/html;base64,{b64}" download="forklift_certificate.html" class="certificate-button">Download Certificate</a>'
-            st.markdown(download_button, unsafe_allow_html=True)
+            html_col, pdf_col = st.columns(2)
+            with html_col:
+                st.download_button(
+                    label="Download Certificate",
+                    data=html_certificate,
+                    file_name="forklift_certificate.html",
+                    mime="text/html",
+                    key="download_certificate_btn",
+                    on_click="ignore"  # No rerun (and no second round of balloons) on download
+                )
+            with pdf_col:
+                if pdf_can_show(st.session_state.name):
+                    _, pdf_certificate = issue_certificate(record, st.session_state.name, "pdf")
+                    # Works offline: no web fonts or remote images
+                    st.download_button(
+                        label="Download Certificate (PDF)",
+                        data=pdf_certificate,
+                        file_name="forklift_certificate.pdf",
+                        mime="application/pdf",
+                        key="download_certificate_pdf_btn",
+                        on_click="ignore"
+                    )
+                else:
+                    st.caption("Your name has characters the PDF certificate can't show. Please download the HTML certificate.")
             st.markdown('</div>', unsafe_allow_html=True)
             
         elif percentage >= 60:
@@ -122,24 +268,36 @@ def quiz_page():
                 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # Display current question if quiz isn't complete
-    elif not st.session_state.quiz_complete:
-        current_q = quiz_questions[st.session_state.current_question]
+    # Question card with the answer feedback. It is a fragment: picking or
+    # submitting an answer reruns only the card, not the page or the app
+    # around it (CSS, logo, sidebar).
+    @st.fragment
+    def question_card():
+        # The completion screen is outside the card, so finishing reruns the whole page
+        if st.session_state.quiz_complete:
+            st.rerun()
         
-        # Show progress
-        st.progress((st.session_state.current_question) / len(quiz_questions))
-        st.markdown(f"**Question {st.session_state.current_question + 1} of {len(quiz_questions)}**")
+        question_ids = st.session_state.quiz_question_ids
+        current_q = question_table[question_ids[st.session_state.current_question]]
+        
+        # Show progress (adaptive quizzes may stop before their maximum length)
+        total_questions = len(st.session_state.quiz_answers) if is_adaptive else len(question_ids)
+        st.progress((st.session_state.current_question) / total_questions)
+        if is_adaptive:
+            st.markdown(f"**Question {st.session_state.current_question + 1} (adaptive, at most {total_questions})**")
+        else:
+            st.markdown(f"**Question {st.session_state.current_question + 1} of {total_questions}**")
         
         st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
         
         # Display the question
-        st.subheader(current_q["question"])
+        st.subheader(current_q.question)
         
         # Use radio buttons for options
         selected_option = st.radio(
             "Select your answer:",
-            options=range(len(current_q["options"])),
-            format_func=lambda x: current_q["options"][x],
+            options=range(len(current_q.options)),
+            format_func=lambda x: current_q.options[x],
             key=f"q{st.session_state.current_question}"
         )
         
@@ -152,16 +310,19 @@ def quiz_page():
                 if is_correct:
                     st.success("✅ Correct!")
                 else:
-                    correct_answer_text = current_q["options"][current_q["answer"]]
+                    correct_answer_text = current_q.options[current_q.answer]
                     st.error(f"❌ Incorrect! The correct answer is: {correct_answer_text}")
                 
                 # Show explanation
-                st.info(f"Explanation: {current_q['explanation']}")
+                st.info(f"Explanation: {current_q.explanation}")
         
-        # Next question button (only show after answering)
+        # Next question button (only show after answering); it moves on
+        # before the card reruns
         if st.session_state.answered:
-            if st.button("Next Question", key=f"next_btn_{st.session_state.current_question}"):
-                next_question()
-                st.rerun()
+            st.button("Next Question", key=f"next_btn_{st.session_state.current_question}", on_click=next_question)
                 
-        st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Display current question if quiz isn't complete
+    if not st.session_state.quiz_complete:
+        question_card()
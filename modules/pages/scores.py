@@ -1,23 +1,18 @@
 import streamlit as st
 import pandas as pd
-from ..ui import load_css, display_logo, navigate_to
-from ..data_manager import get_user_scores, SCORES_FILE
-import json
+from ..ui import display_logo, navigate_to
+from ..data_manager import get_user_scores
+from ..certificate import PASSING_PERCENTAGE, pdf_can_show
+from ..certificate_store import issue_certificate
 
 def scores_page():
-    # Apply custom CSS
-    st.markdown(load_css(), unsafe_allow_html=True)
-    
     # Display logo
     display_logo()
     
     st.title("My Quiz Scores")
     
-    # Load the scores directly from the file to ensure we have the latest data
-    with open(SCORES_FILE, "r") as f:
-        all_scores = json.load(f)
-    
-    user_scores = [s for s in all_scores if s["username"] == st.session_state.username]
+    # Load the scores from the journal to ensure we have the latest data
+    user_scores = get_user_scores(st.session_state.username)
     
     if not user_scores:
         st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
@@ -80,6 +75,36 @@ def scores_page():
         )
         st.markdown('</div>', unsafe_allow_html=True)
         
+        # Certificates for passing attempts, served from the certificate store
+        passed = [s for s in user_scores if s["percentage"] >= PASSING_PERCENTAGE]
+        if passed:
+            st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+            st.markdown("### My Certificates")
+            passed.sort(key=lambda s: s["timestamp"], reverse=True)
+            record = st.selectbox(
+                "Attempt",
+                passed,
+                format_func=lambda s: f"{s['timestamp']} ({s['percentage']:.1f}%)",
+                key="certificate_attempt_select"
+            )
+            # Names the PDF fonts can't show get the HTML certificate instead
+            if pdf_can_show(st.session_state.name):
+                certificate_format, label, mime = "pdf", "Download Certificate (PDF)", "application/pdf"
+            else:
+                certificate_format, label, mime = "html", "Download Certificate", "text/html"
+                st.caption("Your name has characters the PDF certificate can't show, so this is the HTML certificate.")
+            certificate_id, certificate = issue_certificate(record, st.session_state.name, certificate_format)
+            st.caption(f"Certificate ID: {certificate_id}")
+            st.download_button(
+                label=label,
+                data=certificate,
+                file_name=f"forklift_certificate.{certificate_format}",
+                mime=mime,
+                key="download_past_certificate_btn",
+                on_click="ignore"
+            )
+            st.markdown('</div>', unsafe_allow_html=True)
+        
         # Take quiz again button
         if st.button("Take Quiz Again", key="take_quiz_again_from_scores"):
             navigate_to("quiz")
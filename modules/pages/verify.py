@@ -0,0 +1,41 @@
+import streamlit as st
+from ..ui import display_logo
+from ..certificate_store import lookup_certificate, verify_certificate_file
+
+def _show_certificate(record):
+    st.markdown(f"**Issued to:** {record['name']} ({record['username']})")
+    st.markdown(f"**Score:** {record['score']}%")
+    st.markdown(f"**Date of completion:** {record['date']}")
+    st.markdown(f"**Certificate ID:** {record['id']}")
+
+def verify_page():
+    # Display logo
+    display_logo()
+
+    st.title("Verify a Certificate")
+
+    # Look up by the ID printed on the certificate
+    st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+    st.markdown("### Certificate ID")
+    certificate_id = st.text_input("Enter the ID printed at the bottom of the certificate", key="verify_certificate_id")
+    if certificate_id:
+        record = lookup_certificate(certificate_id)
+        if record:
+            st.success("This certificate was issued by this system.")
+            _show_certificate(record)
+        else:
+            st.error("No certificate with this ID has been issued.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Check a presented file byte for byte
+    st.markdown('<div class="quiz-card">', unsafe_allow_html=True)
+    st.markdown("### Certificate File")
+    uploaded_file = st.file_uploader("Upload a certificate (PDF or HTML)", type=["pdf", "html"], key="verify_certificate_file")
+    if uploaded_file is not None:
+        record = verify_certificate_file(uploaded_file.getvalue())
+        if record:
+            st.success("This file is an unaltered copy of an issued certificate.")
+            _show_certificate(record)
+        else:
+            st.error("This file does not match any issued certificate. It may have been altered.")
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,287 @@
+import zlib
+import struct
+import functools
+
+# Minimal PDF writer for generated documents such as certificates. Output
+# depends only on the content (no timestamps or random ids), so the same
+# input always gives byte-identical files, and nothing is fetched from the
+# network.
+#
+# Text uses the standard Helvetica faces that every PDF viewer has built in,
+# so no font file has to be embedded; their character widths (from the Adobe
+# font metrics, in 1/1000 em) are bundled here for centering and wrapping.
+# Characters outside WinAnsi (cp1252) would be shown as "?", so callers
+# check can_encode() before putting text such as a name on a page.
+_HELVETICA_WIDTHS = (
+    # 32-126
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    # 32-126
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+FONTS = {
+    "F1": ("Helvetica", _HELVETICA_WIDTHS),
+    "F2": ("Helvetica-Bold", _HELVETICA_BOLD_WIDTHS),
+}
+
+@functools.lru_cache(maxsize=None)
+def _width_table(font):
+    """Width of every cp1252 byte for a font (built once per process)"""
+    widths = FONTS[font][1]
+    # Accented and other non-ASCII characters use the width of a typical letter
+    return tuple(widths[code - 32] if 32 <= code <= 126 else 556 for code in range(256))
+
+def can_encode(text):
+    """Whether every character of the text can be shown in the built-in fonts"""
+    try:
+        str(text).encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+def encode_text(text):
+    return str(text).encode("cp1252", errors="replace")
+
+def text_width(text, font, size):
+    table = _width_table(font)
+    return sum(table[code] for code in encode_text(text)) * size / 1000
+
+def wrap_text(text, font, size, width):
+    """Split text into lines no wider than width"""
+    lines, line = [], ""
+    for word in str(text).split():
+        candidate = f"{line} {word}" if line else word
+        if line and text_width(candidate, font, size) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+def _pdf_string(data):
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class Canvas:
+    """Builds a page content stream (coordinates in points from the bottom left)"""
+
+    def __init__(self):
+        self.ops = []
+
+    def _op(self, text):
+        self.ops.append(text.encode() if isinstance(text, str) else text)
+
+    def set_fill(self, r, g, b):
+        self._op(f"{r:.3f} {g:.3f} {b:.3f} rg")
+
+    def set_stroke(self, r, g, b):
+        self._op(f"{r:.3f} {g:.3f} {b:.3f} RG")
+
+    def rect(self, x, y, width, height, line_width):
+        self._op(f"{line_width:g} w {x:g} {y:g} {width:g} {height:g} re S")
+
+    def line(self, x1, y1, x2, y2, line_width):
+        self._op(f"{line_width:g} w {x1:g} {y1:g} m {x2:g} {y2:g} l S")
+
+    def text(self, x, y, text, font, size):
+        self._op(f"BT /{font} {size:g} Tf {x:.2f} {y:.2f} Td ".encode() + _pdf_string(encode_text(text)) + b" Tj ET")
+
+    def centered_text(self, center_x, y, text, font, size):
+        self.text(center_x - text_width(text, font, size) / 2, y, text, font, size)
+
+    def image(self, name, x, y, width, height, state=None):
+        gs = f"/{state} gs " if state else ""
+        self._op(f"q {gs}{width:.2f} 0 0 {height:.2f} {x:.2f} {y:.2f} cm /{name} Do Q")
+
+    def content(self):
+        return b"\n".join(self.ops)
+
+# Images
+def _png_chunks(data):
+    position = 8
+    while position + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        yield kind, data[position + 8:position + 8 + length]
+        position += 12 + length
+
+def _unfilter(raw, width, height, bpp):
+    """Undo the PNG row filters (8-bit samples)"""
+    stride = width * bpp
+    pixels = bytearray(stride * height)
+    previous = bytearray(stride)
+    position = 0
+    for row in range(height):
+        kind = raw[position]
+        line = bytearray(raw[position + 1:position + 1 + stride])
+        position += 1 + stride
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, previous))
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = previous[i]
+                c = previous[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                line[i] = (line[i] + predictor) & 0xFF
+        pixels[row * stride:(row + 1) * stride] = line
+        previous = line
+    return pixels
+
+def _decode_png(data):
+    """(width, height, color space, samples, alpha samples or None), or None if unsupported"""
+    header, idat, palette, transparency = None, [], None, None
+    for kind, body in _png_chunks(data):
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            transparency = body
+    if header is None:
+        return None
+    width, height, depth, color_type, _, _, interlace = header
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color_type)
+    if depth != 8 or interlace or channels is None:
+        return None
+    pixels = _unfilter(zlib.decompress(b"".join(idat)), width, height, channels)
+
+    if color_type == 0:
+        return width, height, "/DeviceGray", bytes(pixels), None
+    if color_type == 2:
+        return width, height, "/DeviceRGB", bytes(pixels), None
+    if color_type == 3:
+        # Expand the palette (and its transparency) one channel at a time
+        palette = palette.ljust(768, b"\0")
+        rgb = bytearray(len(pixels) * 3)
+        for channel in range(3):
+            rgb[channel::3] = pixels.translate(palette[channel::3])
+        alpha = None
+        if transparency:
+            alpha = bytes(pixels.translate(transparency.ljust(256, b"\xff")[:256]))
+        return width, height, "/DeviceRGB", bytes(rgb), alpha
+    if color_type == 4:
+        return width, height, "/DeviceGray", bytes(pixels[0::2]), bytes(pixels[1::2])
+    rgb = bytearray(width * height * 3)
+    for channel in range(3):
+        rgb[channel::3] = pixels[channel::4]
+    return width, height, "/DeviceRGB", bytes(rgb), bytes(pixels[3::4])
+
+def _jpeg_info(data):
+    """(width, height, color space) from a JPEG's frame header, or None"""
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        length = struct.unpack(">H", data[position + 2:position + 4])[0]
+        if marker in (0xC0, 0xC1, 0xC2):
+            height, width, components = struct.unpack(">HHB", data[position + 5:position + 10])
+            spaces = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+            return (width, height, spaces[components]) if components in spaces else None
+        position += 2 + length
+    return None
+
+@functools.lru_cache(maxsize=8)
+def prepare_image(data):
+    """Decode an image once: (width, height, image dict, stream, soft mask dict, soft mask stream).
+
+    PNG and JPEG are supported; returns None for anything else. Cached, so a
+    logo is only decoded once per process.
+    """
+    if data[:2] == b"\xff\xd8":
+        info = _jpeg_info(data)
+        if info is None:
+            return None
+        width, height, space = info
+        image = f"/Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace {space} /BitsPerComponent 8 /Filter /DCTDecode"
+        return width, height, image, data, None, None
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    decoded = _decode_png(data)
+    if decoded is None:
+        return None
+    width, height, space, samples, alpha = decoded
+    common = f"/Type /XObject /Subtype /Image /Width {width} /Height {height} /BitsPerComponent 8 /Filter /FlateDecode"
+    mask = (f"{common} /ColorSpace /DeviceGray", zlib.compress(alpha, 9)) if alpha is not None else (None, None)
+    return width, height, f"{common} /ColorSpace {space}", zlib.compress(samples, 9), mask[0], mask[1]
+
+class Document:
+    """Single-page PDF assembled from numbered objects"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.objects = []
+        self.images = {}
+        self.states = {}
+
+    def add(self, body):
+        self.objects.append(body if isinstance(body, bytes) else body.encode())
+        return len(self.objects)
+
+    def add_stream(self, dictionary, data):
+        return self.add(f"<< {dictionary} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    def add_image(self, name, prepared):
+        """Embed a prepared image once under /name"""
+        width, height, image, stream, mask, mask_stream = prepared
+        if mask is not None:
+            image += f" /SMask {self.add_stream(mask, mask_stream)} 0 R"
+        self.images[name] = self.add_stream(image, stream)
+
+    def add_opacity(self, name, opacity):
+        self.states[name] = self.add(f"<< /Type /ExtGState /ca {opacity:g} /CA {opacity:g} >>")
+
+    def render(self, canvas, title):
+        """The finished PDF file as bytes"""
+        fonts = " ".join(
+            f"/{key} {self.add(f'<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>')} 0 R"
+            for key, (base, _) in FONTS.items()
+        )
+        images = " ".join(f"/{name} {number} 0 R" for name, number in self.images.items())
+        states = " ".join(f"/{name} {number} 0 R" for name, number in self.states.items())
+        content = self.add_stream("/Filter /FlateDecode", zlib.compress(canvas.content(), 9))
+
+        pages = len(self.objects) + 2
+        page = self.add(
+            f"<< /Type /Page /Parent {pages} 0 R /MediaBox [0 0 {self.width:g} {self.height:g}] "
+            f"/Resources << /Font << {fonts} >> /XObject << {images} >> /ExtGState << {states} >> >> "
+            f"/Contents {content} 0 R >>"
+        )
+        self.add(f"<< /Type /Pages /Kids [{page} 0 R] /Count 1 >>")
+        catalog = self.add(f"<< /Type /Catalog /Pages {pages} 0 R >>")
+        info = self.add(b"<< /Title " + _pdf_string(encode_text(title)) + b" /Producer (Forklift Operator Training) >>")
+
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self.objects, start=1):
+            offsets.append(len(output))
+            output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(output)
+        output += f"xref\n0 {len(self.objects) + 1}\n0000000000 65535 f \n".encode()
+        output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+        output += f"trailer\n<< /Size {len(self.objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(output)
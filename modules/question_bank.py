@@ -0,0 +1,103 @@
+import random
+import weakref
+import threading
+from types import MappingProxyType
+from .data_manager import load_questions, questions_version, load_quiz_blueprint
+
+# Shared question table, built once per bank version and used by every
+# session. Quizzes only keep question ids and look the content up here.
+class Question:
+    __slots__ = ("id", "question", "options", "answer", "explanation", "category")
+
+    def __init__(self, data):
+        set_field = object.__setattr__
+        set_field(self, "id", data["id"])
+        set_field(self, "question", data["question"])
+        set_field(self, "options", tuple(data["options"]))
+        set_field(self, "answer", data["answer"])
+        set_field(self, "explanation", data["explanation"])
+        set_field(self, "category", data.get("category", "General"))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Questions are shared between sessions and can't be modified")
+
+# Each saved edit of the bank becomes a new immutable QuestionBank. A running
+# quiz keeps a reference to the bank it was drawn from, so it never sees a
+# half-edited bank; new quizzes get the latest one. Banks are only weakly
+# registered, so a version disappears once no quiz refers to it any more.
+class QuestionBank:
+    __slots__ = ("version", "number", "questions", "by_category", "__weakref__")
+
+    def __init__(self, version, number, questions):
+        set_field = object.__setattr__
+        table, by_category = {}, {}
+        for data in questions:
+            question = Question(data)
+            table[question.id] = question
+            by_category.setdefault(question.category, []).append(question.id)
+        set_field(self, "version", version)
+        set_field(self, "number", number)
+        set_field(self, "questions", MappingProxyType(table))
+        set_field(self, "by_category", MappingProxyType(
+            {category: tuple(ids) for category, ids in by_category.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Question banks are immutable")
+
+    def __len__(self):
+        return len(self.questions)
+
+_bank_lock = threading.Lock()
+_banks = weakref.WeakValueDictionary()
+_latest = {"bank": None, "number": 0}
+
+def get_question_bank():
+    """The latest question bank, built once per saved version"""
+    version = questions_version()
+    with _bank_lock:
+        bank = _latest["bank"]
+        if bank is None or bank.version != version:
+            bank = _banks.get(version)
+            if bank is None:
+                _latest["number"] += 1
+                bank = QuestionBank(version, _latest["number"], load_questions())
+                _banks[version] = bank
+            _latest["bank"] = bank
+        return bank
+
+def live_bank_versions():
+    """Version numbers of the banks still in memory (the latest plus any used by running quizzes)"""
+    with _bank_lock:
+        return sorted(bank.number for bank in _banks.values())
+
+def get_question_table():
+    """Question id -> Question for the latest bank"""
+    return get_question_bank().questions
+
+def get_category_index():
+    """Category -> tuple of question ids for the latest bank"""
+    return get_question_bank().by_category
+
+def blueprint_counts(blueprint, index):
+    """Number of questions to draw from each category under a blueprint"""
+    default = blueprint.get("default_per_category") or 0
+    per_category = blueprint.get("per_category", {})
+    counts = {}
+    for category, question_ids in index.items():
+        wanted = per_category.get(category, default) or len(question_ids)
+        counts[category] = min(wanted, len(question_ids))
+    return counts
+
+def draw_quiz_question_ids(blueprint=None, bank=None):
+    """Stratified random sample of question ids from a bank (the latest by default), in random order"""
+    if blueprint is None:
+        blueprint = load_quiz_blueprint()
+    if bank is None:
+        bank = get_question_bank()
+    index = bank.by_category
+    
+    question_ids = []
+    for category, count in blueprint_counts(blueprint, index).items():
+        question_ids.extend(random.sample(index[category], count))
+    random.shuffle(question_ids)
+    return tuple(question_ids)
@@ -0,0 +1,67 @@
+import sys
+import time
+import threading
+import importlib
+from collections import deque
+from .data_manager import ensure_directories, initialize_data_files
+
+# Work that only has to happen once per process is done once, rather than on
+# every rerun: creating the data directories and default files. Page modules
+# are imported the first time their page is shown, so an operator who only
+# takes quizzes never loads pandas (used by the scores and admin pages).
+# How long each of these took is kept for get_startup_report().
+PAGES = {
+    "login": ("login", "login_page"),
+    "quiz": ("quiz", "quiz_page"),
+    "scores": ("scores", "scores_page"),
+    "verify": ("verify", "verify_page"),
+    "documentation": ("documentation", "documentation_page"),
+    "admin": ("admin", "admin_page"),
+}
+
+_lock = threading.Lock()
+_report = {
+    "bootstrap_ms": None,
+    "page_imports_ms": {},  # Page -> time to import its module (and anything it loaded first)
+    "recent_runs_ms": deque(maxlen=200),  # Per-run fixed overhead before the page itself
+}
+
+def bootstrap():
+    """Create the data directories and files, once per process"""
+    if _report["bootstrap_ms"] is not None:
+        return
+    with _lock:
+        if _report["bootstrap_ms"] is None:
+            started = time.perf_counter()
+            ensure_directories()
+            initialize_data_files()
+            _report["bootstrap_ms"] = (time.perf_counter() - started) * 1000
+
+def get_page(page):
+    """The function that renders a page, importing its module on first use"""
+    module_name, function = PAGES[page]
+    module_name = f"{__package__}.pages.{module_name}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        with _lock:
+            started = time.perf_counter()
+            module = importlib.import_module(module_name)
+            _report["page_imports_ms"].setdefault(page, (time.perf_counter() - started) * 1000)
+    return getattr(module, function)
+
+def record_run(overhead_ms):
+    """Record the fixed overhead of one script run"""
+    with _lock:
+        _report["recent_runs_ms"].append(overhead_ms)
+
+def get_startup_report():
+    """Bootstrap and page import times, and the fixed per-run overhead of recent runs"""
+    with _lock:
+        runs = list(_report["recent_runs_ms"])
+        return {
+            "bootstrap_ms": _report["bootstrap_ms"],
+            "page_imports_ms": dict(_report["page_imports_ms"]),
+            "runs": len(runs),
+            "avg_run_ms": sum(runs) / len(runs) if runs else 0.0,
+            "max_run_ms": max(runs, default=0.0),
+        }
@@ -0,0 +1,739 @@
+import os
+import gzip
+import json
+import sqlite3
+import datetime
+import threading
+
+# Storage engines behind the data_manager API.
+# Every engine exposes the same methods, so data_manager can switch between
+# them without changing any of its function signatures.
+
+def _file_signature(path):
+    # Changes whenever the file is rewritten, appended to or replaced
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _atomic_write(path, write):
+    # Write to a temp file and rename it over the original, so readers
+    # never see a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _append_lines(path, lines, sync=False):
+    # Append complete lines. A crash mid-append can leave a last line without
+    # its newline; end it first, so the new lines aren't merged into it (the
+    # torn line is then skipped on read, as before)
+    data = lines.encode()
+    with open(path, "ab+") as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+
+# Score history segments.
+# New attempts go to the active journal; attempts from past months are sealed
+# into gzip-compressed monthly segments (YYYY-MM.jsonl.gz) and, once older than
+# the retention period, moved to an archive directory that readers don't open.
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+def _month(timestamp):
+    return timestamp[:7]
+
+def _shift_month(month, months):
+    year, mon = map(int, month.split("-"))
+    index = year * 12 + (mon - 1) + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def _parse_json_lines(data):
+    scores = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            scores.append(json.loads(line))
+        except ValueError:
+            # A torn line from a crash mid-append; skip it
+            continue
+    return scores
+
+def _in_range(score_data, start, end):
+    return (start is None or score_data["timestamp"] >= start) and (end is None or score_data["timestamp"] <= end)
+
+class _Segment:
+    __slots__ = ("signature", "records", "by_user")
+
+    def __init__(self, signature, records):
+        self.signature = signature
+        self.records = records
+        self.by_user = {}
+        for score_data in records:
+            self.by_user.setdefault(score_data["username"], []).append(score_data)
+
+# In-memory index over the score history. Sealed segments are decompressed
+# once, the first time a query needs them. The active journal is kept current
+# by reading only the bytes appended since the last refresh; a rewritten or
+# replaced journal (different inode, or shorter than what was read) is re-read
+# from the start.
+class ScoreLogIndex:
+    def __init__(self, path, segments_dir=None):
+        self.path = path
+        self.segments_dir = segments_dir
+        self._lock = threading.Lock()
+        self._segments = {}  # month -> _Segment
+        self._reset(None)
+
+    def _reset(self, inode):
+        self.inode = inode
+        self.offset = 0
+        self.records = []
+        self.by_user = {}
+
+    def segment_months(self):
+        """Months with an online (not archived) sealed segment, oldest first"""
+        if not self.segments_dir or not os.path.isdir(self.segments_dir):
+            return []
+        return sorted(
+            name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(self.segments_dir)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _segment(self, month):
+        path = os.path.join(self.segments_dir, month + SEGMENT_SUFFIX)
+        signature = _file_signature(path)
+        segment = self._segments.get(month)
+        if segment is None or segment.signature != signature:
+            with gzip.open(path, "rb") as f:
+                segment = _Segment(signature, _parse_json_lines(f.read()))
+            self._segments[month] = segment
+        return segment
+
+    def _online_segments(self, start=None, end=None):
+        months = self.segment_months()
+        # Forget segments that were archived or removed
+        for month in set(self._segments) - set(months):
+            del self._segments[month]
+        return [
+            self._segment(month) for month in months
+            if (start is None or month >= _month(start)) and (end is None or month <= _month(end))
+        ]
+
+    def _refresh_active(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset(None)
+            return
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self._reset(st.st_ino)
+        if st.st_size == self.offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+
+        # Only consume complete lines; a partial last line is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        for score_data in _parse_json_lines(chunk[:end]):
+            self.records.append(score_data)
+            self.by_user.setdefault(score_data["username"], []).append(score_data)
+        self.offset += end
+
+    def sealed_scores(self):
+        """Attempts in the online sealed segments, oldest month first"""
+        with self._lock:
+            scores = []
+            for segment in self._online_segments():
+                scores.extend(segment.records)
+            return scores
+
+    def all_scores(self):
+        with self._lock:
+            self._refresh_active()
+            scores = []
+            for segment in self._online_segments():
+                scores.extend(segment.records)
+            scores.extend(self.records)
+            return scores
+
+    def scores_between(self, start, end):
+        """Attempts with start <= timestamp <= end, opening only the segments in range"""
+        with self._lock:
+            self._refresh_active()
+            scores = []
+            for segment in self._online_segments(start, end):
+                scores.extend(s for s in segment.records if _in_range(s, start, end))
+            scores.extend(s for s in self.records if _in_range(s, start, end))
+            return scores
+
+    def user_scores(self, username):
+        with self._lock:
+            self._refresh_active()
+            scores = []
+            for segment in self._online_segments():
+                scores.extend(segment.by_user.get(username, ()))
+            scores.extend(self.by_user.get(username, ()))
+            return scores
+
+# Plain JSON files (the original storage format)
+class JsonStorage:
+    # User lookups have to load the whole users file
+    indexed = False
+
+    def __init__(self, users_file, questions_file, scores_log_file, legacy_scores_file=None,
+                 segments_dir=None, retention_months=0, responses_file=None):
+        self.users_file = users_file
+        self.questions_file = questions_file
+        self.scores_log_file = scores_log_file
+        self.legacy_scores_file = legacy_scores_file
+        self.segments_dir = segments_dir
+        self.archive_dir = os.path.join(segments_dir, "archive") if segments_dir else None
+        self.retention_months = retention_months
+        self.responses_file = responses_file
+        self.score_index = ScoreLogIndex(scores_log_file, segments_dir)
+
+        # Serializes appends with sealing, which rewrites the active journal
+        self._scores_lock = threading.Lock()
+        self._rolled_month = None
+
+    def initialize(self, default_users, default_questions):
+        """Create any missing data files (defaults are built lazily by the given callables)"""
+        if not os.path.exists(self.users_file):
+            self.save_users(default_users())
+        if not os.path.exists(self.questions_file):
+            self.save_questions(default_questions())
+
+        # Copy any legacy scores.json into the journal, then make sure it exists
+        self.migrate_legacy_scores()
+        if not os.path.exists(self.scores_log_file):
+            open(self.scores_log_file, "a").close()
+        self.roll_over()
+
+    def migrate_legacy_scores(self):
+        """Convert the legacy scores array into the journal if the journal doesn't exist yet.
+
+        The legacy file is left in place (it is tracked in the repository); the
+        journal's existence is what marks the migration as done.
+        """
+        if (not self.legacy_scores_file or not os.path.exists(self.legacy_scores_file)
+                or os.path.exists(self.scores_log_file)):
+            return False
+
+        with open(self.legacy_scores_file, "r") as f:
+            scores = json.load(f)
+        self._write_scores_log(scores)
+        return True
+
+    def signature(self, kind):
+        """Cheap fingerprint of the users, questions or scores data"""
+        paths = {
+            "users": self.users_file,
+            "questions": self.questions_file,
+            "responses": self.responses_file,
+        }
+        if kind == "scores":
+            # Sealing or archiving a segment changes the directory listing
+            return (_file_signature(self.scores_log_file), _file_signature(self.segments_dir))
+        return _file_signature(paths[kind])
+
+    # Users
+    def load_users(self):
+        if os.path.exists(self.users_file):
+            with open(self.users_file, "r") as f:
+                return json.load(f)
+        return {}
+
+    def get_user(self, username):
+        return self.load_users().get(username)
+
+    def save_users(self, users):
+        _atomic_write(self.users_file, lambda f: json.dump(users, f))
+
+    def save_user_changes(self, users, changed, removed):
+        """Save users after an update (the file is always rewritten whole)"""
+        self.save_users(users)
+
+    # Questions
+    def load_questions(self):
+        if os.path.exists(self.questions_file):
+            with open(self.questions_file, "r") as f:
+                return json.load(f)
+        return []
+
+    def save_questions(self, questions):
+        _atomic_write(self.questions_file, lambda f: json.dump(questions, f))
+
+    # Scores
+    def load_scores(self, start=None, end=None):
+        if start is None and end is None:
+            return self.score_index.all_scores()
+        return self.score_index.scores_between(start, end)
+
+    def get_user_scores(self, username):
+        return self.score_index.user_scores(username)
+
+    def read_scores(self, cursor=None):
+        """Attempts appended since cursor, as (scores, new cursor, reset).
+        
+        Only the journal bytes past the cursor are read. reset is True when
+        reading started over (no cursor, the journal was rewritten, or
+        segments were sealed or archived), so scores holds the whole history.
+        """
+        while True:
+            # Only the journal's size and the segment listing are taken under
+            # the lock appends use. Bytes up to that size never change (sealing
+            # replaces the journal, and the open file keeps the old one), so
+            # they and the sealed segments are read outside it
+            with self._scores_lock:
+                segments = _file_signature(self.segments_dir) if self.segments_dir else None
+                try:
+                    f = open(self.scores_log_file, "rb")
+                except FileNotFoundError:
+                    f = None
+                else:
+                    inode, size = os.fstat(f.fileno()).st_ino, os.fstat(f.fileno()).st_size
+            if f is None:
+                chunk, end, new_cursor, reset = b"", 0, None, True
+            else:
+                with f:
+                    reset = (cursor is None or cursor[0] != inode or cursor[1] > size
+                             or list(cursor[2] or []) != list(segments or []))
+                    offset = 0 if reset else cursor[1]
+                    f.seek(offset)
+                    chunk = f.read(size - offset)
+                end = chunk.rfind(b"\n") + 1
+                new_cursor = (inode, offset + end, segments)
+            scores = _parse_json_lines(chunk[:end])
+            if not (reset and self.segments_dir):
+                break
+            sealed = self.score_index.sealed_scores()
+            # A roll-over in the meantime moved journal attempts into segments;
+            # read again rather than return them twice
+            if _file_signature(self.segments_dir) == segments:
+                scores = sealed + scores
+                break
+        return scores, new_cursor, reset
+
+    def save_scores(self, scores):
+        with self._scores_lock:
+            self._write_scores_log(scores)
+            # Everything now lives in the active journal; the next roll-over reseals it
+            for month in self.score_index.segment_months():
+                os.remove(os.path.join(self.segments_dir, month + SEGMENT_SUFFIX))
+            self._rolled_month = None
+
+    def append_scores(self, scores):
+        """Append a batch of attempts with a single write and a single fsync"""
+        lines = "".join(json.dumps(score_data) + "\n" for score_data in scores)
+        with self._scores_lock:
+            _append_lines(self.scores_log_file, lines, sync=True)
+
+    def roll_over(self, current_month=None):
+        """Seal past months into compressed segments and archive those past retention"""
+        current_month = current_month or datetime.datetime.now().strftime("%Y-%m")
+        if not self.segments_dir or self._rolled_month == current_month:
+            return
+        with self._scores_lock:
+            if self._rolled_month == current_month:
+                return
+            os.makedirs(self.segments_dir, exist_ok=True)
+            self._seal_before(current_month)
+            if self.retention_months:
+                self._archive_before(_shift_month(current_month, -self.retention_months))
+            self._rolled_month = current_month
+
+    # Responses (one record per answered question)
+    def load_responses(self):
+        return self.read_responses()[0]
+
+    def read_responses(self, cursor=None):
+        """Responses appended since cursor, as (responses, new cursor, reset).
+        
+        reset is True when reading started over from the beginning (no
+        cursor, or the file was replaced), so responses holds the whole log.
+        """
+        if not self.responses_file or not os.path.exists(self.responses_file):
+            return [], None, True
+        with open(self.responses_file, "rb") as f:
+            inode, size = os.fstat(f.fileno()).st_ino, os.fstat(f.fileno()).st_size
+            reset = cursor is None or cursor[0] != inode or cursor[1] > size
+            offset = 0 if reset else cursor[1]
+            f.seek(offset)
+            chunk = f.read()
+        # Leave a partly written last line for the next read
+        end = chunk.rfind(b"\n") + 1
+        return _parse_json_lines(chunk[:end]), (inode, offset + end), reset
+
+    def append_responses(self, responses):
+        """Append a batch of responses with a single write"""
+        lines = "".join(json.dumps(response) + "\n" for response in responses)
+        _append_lines(self.responses_file, lines)
+
+    def _seal_before(self, month):
+        if not os.path.exists(self.scores_log_file):
+            return
+        with open(self.scores_log_file, "rb") as f:
+            scores = _parse_json_lines(f.read())
+
+        by_month = {}
+        for score_data in scores:
+            if _month(score_data["timestamp"]) < month:
+                by_month.setdefault(_month(score_data["timestamp"]), []).append(score_data)
+        if not by_month:
+            return
+
+        # Write the segments before trimming the journal, so a crash in between
+        # can only leave duplicates (which the next seal drops), never lose data
+        for segment_month, segment_scores in by_month.items():
+            self._write_segment(segment_month, segment_scores)
+        self._write_scores_log([s for s in scores if _month(s["timestamp"]) >= month])
+
+    def _write_segment(self, month, scores):
+        path = os.path.join(self.segments_dir, month + SEGMENT_SUFFIX)
+        lines = [json.dumps(score_data) + "\n" for score_data in scores]
+        if os.path.exists(path):
+            # Late attempts for an already sealed month: merge, skipping duplicates
+            with gzip.open(path, "rt") as f:
+                existing = f.read().splitlines(keepends=True)
+            seen = set(existing)
+            lines = existing + [line for line in lines if line not in seen]
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as raw:
+            # mtime=0 keeps the compressed bytes deterministic
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write("".join(lines).encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+
+    def _archive_before(self, month):
+        for segment_month in self.score_index.segment_months():
+            if segment_month >= month:
+                continue
+            os.makedirs(self.archive_dir, exist_ok=True)
+            name = segment_month + SEGMENT_SUFFIX
+            source = os.path.join(self.segments_dir, name)
+            target = os.path.join(self.archive_dir, name)
+            if os.path.exists(target):
+                # gzip members can be concatenated, so append instead of overwriting
+                with open(source, "rb") as src, open(target, "ab") as dst:
+                    dst.write(src.read())
+                os.remove(source)
+            else:
+                os.replace(source, target)
+
+    def _write_scores_log(self, scores):
+        _atomic_write(
+            self.scores_log_file,
+            lambda f: f.writelines(json.dumps(score_data) + "\n" for score_data in scores)
+        )
+
+# Indexed SQLite database in WAL mode
+class SqliteStorage:
+    indexed = True
+
+    SCHEMA_VERSION = 4
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL,
+        name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        position INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        max_score INTEGER NOT NULL,
+        percentage REAL NOT NULL,
+        timestamp TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_scores_username_timestamp ON scores (username, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores (timestamp);
+    CREATE TABLE IF NOT EXISTS scores_archive (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        max_score INTEGER NOT NULL,
+        percentage REAL NOT NULL,
+        timestamp TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS versions (
+        kind TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO versions (kind, version) VALUES ('users', 0), ('questions', 0);
+    CREATE TABLE IF NOT EXISTS responses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        attempt TEXT NOT NULL,
+        question_id INTEGER NOT NULL,
+        chosen INTEGER NOT NULL,
+        correct INTEGER NOT NULL,
+        latency_ms INTEGER NOT NULL,
+        timestamp TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, db_file, import_from=None, retention_months=0):
+        self.db_file = db_file
+        # Existing JSON data to import the first time the database is created
+        self.import_from = import_from
+        self.retention_months = retention_months
+        self._local = threading.local()
+        self._rolled_month = None
+
+    def _connect(self):
+        # SQLite connections can't be shared across threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def initialize(self, default_users, default_questions):
+        """Create the schema and seed it from the JSON files (or defaults) on first run"""
+        conn = self._connect()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._create(conn, default_users, default_questions)
+        elif version < self.SCHEMA_VERSION:
+            # Existing database: the schema script only adds what's new
+            conn.executescript(self.SCHEMA)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.roll_over()
+
+    def _create(self, conn, default_users, default_questions):
+        conn.executescript(self.SCHEMA)
+        users, questions, scores = {}, [], []
+        if self.import_from is not None:
+            self.import_from.migrate_legacy_scores()
+            users = self.import_from.load_users()
+            questions = self.import_from.load_questions()
+            scores = self.import_from.load_scores()
+        users = users or default_users()
+        questions = questions or default_questions()
+
+        with conn:
+            self._replace_users(conn, users)
+            self._replace_questions(conn, questions)
+            self._replace_scores(conn, scores)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def signature(self, kind):
+        """Cheap fingerprint of the users, questions or scores data"""
+        if kind in ("scores", "responses"):
+            # AUTOINCREMENT ids are never reused, so these change on every insert,
+            # rewrite or archive of the oldest rows
+            return tuple(self._connect().execute(
+                f"SELECT (SELECT seq FROM sqlite_sequence WHERE name = '{kind}'), "
+                f"(SELECT MAX(id) FROM {kind}), (SELECT MIN(id) FROM {kind})"
+            ).fetchone())
+        # Bumped in the same transaction as every write to the table, so
+        # writes to other tables (scores, responses) don't change it
+        row = self._connect().execute("SELECT version FROM versions WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _bump_version(conn, kind):
+        conn.execute("UPDATE versions SET version = version + 1 WHERE kind = ?", (kind,))
+
+    # Users
+    def load_users(self):
+        rows = self._connect().execute("SELECT username, password, role, name FROM users ORDER BY rowid")
+        return {row["username"]: self._user_from_row(row) for row in rows}
+
+    def get_user(self, username):
+        row = self._connect().execute(
+            "SELECT username, password, role, name FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return self._user_from_row(row) if row else None
+
+    def save_users(self, users):
+        conn = self._connect()
+        with conn:
+            self._replace_users(conn, users)
+
+    def save_user_changes(self, users, changed, removed):
+        """Write only the changed (username -> record) and removed users"""
+        conn = self._connect()
+        with conn:
+            self._bump_version(conn, "users")
+            conn.executemany(
+                "INSERT INTO users (username, password, role, name) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET password = excluded.password, role = excluded.role, name = excluded.name",
+                [(username, info["password"], info["role"], info["name"]) for username, info in changed.items()]
+            )
+            conn.executemany("DELETE FROM users WHERE username = ?", [(username,) for username in removed])
+
+    @staticmethod
+    def _user_from_row(row):
+        return {"password": row["password"], "role": row["role"], "name": row["name"]}
+
+    @classmethod
+    def _replace_users(cls, conn, users):
+        cls._bump_version(conn, "users")
+        conn.execute("DELETE FROM users")
+        conn.executemany(
+            "INSERT INTO users (username, password, role, name) VALUES (?, ?, ?, ?)",
+            [(username, info["password"], info["role"], info["name"]) for username, info in users.items()]
+        )
+
+    # Questions
+    def load_questions(self):
+        rows = self._connect().execute("SELECT data FROM questions ORDER BY position")
+        return [json.loads(row["data"]) for row in rows]
+
+    def save_questions(self, questions):
+        conn = self._connect()
+        with conn:
+            self._replace_questions(conn, questions)
+
+    @classmethod
+    def _replace_questions(cls, conn, questions):
+        cls._bump_version(conn, "questions")
+        conn.execute("DELETE FROM questions")
+        conn.executemany(
+            "INSERT INTO questions (id, position, data) VALUES (?, ?, ?)",
+            [(q["id"], position, json.dumps(q)) for position, q in enumerate(questions)]
+        )
+
+    # Scores
+    def load_scores(self, start=None, end=None):
+        # Time ranges are answered from the timestamp index
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp <= ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self._connect().execute(
+            f"SELECT username, score, max_score, percentage, timestamp FROM scores {where}ORDER BY id",
+            params
+        )
+        return [dict(row) for row in rows]
+
+    SCORE_FIELDS = ("username", "score", "max_score", "percentage", "timestamp")
+
+    def read_scores(self, cursor=None):
+        """Attempts inserted since cursor, as (scores, new cursor, reset).
+        
+        The cursor is (last id read, first id then). Archiving or replacing
+        the scores changes the first id, which starts reading over.
+        """
+        conn = self._connect()
+        sequence, first = conn.execute(
+            "SELECT (SELECT seq FROM sqlite_sequence WHERE name = 'scores'), (SELECT MIN(id) FROM scores)"
+        ).fetchone()
+        reset = (cursor is None or sequence is None or sequence < cursor[0]
+                 or (cursor[1] is not None and first != cursor[1]))
+        last = 0 if reset else cursor[0]
+        rows = conn.execute(
+            f"SELECT id, {', '.join(self.SCORE_FIELDS)} FROM scores WHERE id > ? ORDER BY id", (last,)
+        ).fetchall()
+        if rows:
+            last = rows[-1]["id"]
+        return ([{field: row[field] for field in self.SCORE_FIELDS} for row in rows],
+                (last, first), reset)
+
+    def get_user_scores(self, username):
+        rows = self._connect().execute(
+            "SELECT username, score, max_score, percentage, timestamp FROM scores "
+            "WHERE username = ? ORDER BY timestamp, id",
+            (username,)
+        )
+        return [dict(row) for row in rows]
+
+    def save_scores(self, scores):
+        conn = self._connect()
+        with conn:
+            self._replace_scores(conn, scores)
+
+    def append_scores(self, scores):
+        """Insert a batch of attempts in one transaction"""
+        conn = self._connect()
+        with conn:
+            self._insert_scores(conn, scores)
+
+    def roll_over(self, current_month=None):
+        """Move attempts older than the retention period into scores_archive"""
+        current_month = current_month or datetime.datetime.now().strftime("%Y-%m")
+        if not self.retention_months or self._rolled_month == current_month:
+            return
+        cutoff = _shift_month(current_month, -self.retention_months)
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO scores_archive SELECT * FROM scores WHERE timestamp < ?", (cutoff,))
+            conn.execute("DELETE FROM scores WHERE timestamp < ?", (cutoff,))
+        self._rolled_month = current_month
+
+    @classmethod
+    def _replace_scores(cls, conn, scores):
+        conn.execute("DELETE FROM scores")
+        cls._insert_scores(conn, scores)
+
+    @staticmethod
+    def _insert_scores(conn, scores):
+        conn.executemany(
+            "INSERT INTO scores (username, score, max_score, percentage, timestamp) VALUES (?, ?, ?, ?, ?)",
+            [(s["username"], s["score"], s["max_score"], s["percentage"], s["timestamp"]) for s in scores]
+        )
+
+    # Responses (one record per answered question)
+    RESPONSE_FIELDS = ("username", "attempt", "question_id", "chosen", "correct", "latency_ms", "timestamp")
+
+    def load_responses(self):
+        return self.read_responses()[0]
+
+    def read_responses(self, cursor=None):
+        """Responses inserted since cursor, as (responses, new cursor, reset)"""
+        conn = self._connect()
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'responses'").fetchone()
+        reset = cursor is None or sequence is None or sequence[0] < cursor
+        rows = conn.execute(
+            f"SELECT id, {', '.join(self.RESPONSE_FIELDS)} FROM responses WHERE id > ? ORDER BY id",
+            (0 if reset else cursor,)
+        ).fetchall()
+        new_cursor = rows[-1]["id"] if rows else (0 if reset else cursor)
+        return [self._response_from_row(row) for row in rows], new_cursor, reset
+
+    @classmethod
+    def _response_from_row(cls, row):
+        response = {field: row[field] for field in cls.RESPONSE_FIELDS}
+        response["correct"] = bool(response["correct"])
+        return response
+
+    def append_responses(self, responses):
+        """Insert a batch of responses in one transaction"""
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO responses (username, attempt, question_id, chosen, correct, latency_ms, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(r["username"], r["attempt"], r["question_id"], r["chosen"], int(r["correct"]),
+                  r["latency_ms"], r["timestamp"]) for r in responses]
+            )
@@ -1,7 +1,6 @@
 import streamlit as st
 import base64
-import os
-from .data_manager import LOGO_PATH
+from .assets import get_logo
 
 # Custom CSS for modern look
 def load_css():
@@ -130,15 +129,19 @@ def get_base64_encoded_image(image_path):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
+# Apply the custom CSS (once per run, from app.main)
+def apply_css():
+    st.markdown(load_css(), unsafe_allow_html=True)
+
 # Display company logo
 def display_logo():
     # Check if logo file exists
-    if os.path.exists(LOGO_PATH):
-        # Use actual logo file
-        logo_base64 = get_base64_encoded_image(LOGO_PATH)
+    logo = get_logo()
+    if logo is not None:
+        # Use actual logo file (a static URL, or a cached data URI)
         logo_html = f"""
         <div class="logo-container">
-            <img src="data:image/png;base64,{logo_base64}" alt="Company Logo">
+            <img src="{logo.url()}" alt="Company Logo">
         </div>
         """
     else:
@@ -165,48 +168,70 @@ def navigate_to(page):
     if page != "quiz":
         if "current_question" in st.session_state:
             del st.session_state.current_question
-        if "score" in st.session_state:
-            del st.session_state.score
+        if "quiz_answers" in st.session_state:
+            del st.session_state.quiz_answers
+        if "quiz_correct" in st.session_state:
+            del st.session_state.quiz_correct
         if "answered" in st.session_state:
             del st.session_state.answered
         if "quiz_complete" in st.session_state:
             del st.session_state.quiz_complete
 
+def clear_quiz_state():
+    """Forget the quiz in progress (on login and logout, so the next user on a
+    shared device starts from their own checkpoint, not this user's draw)"""
+    for key in list(st.session_state.keys()):
+        if key.startswith("quiz_") or key in ("current_question", "answered", "question_shown_at"):
+            del st.session_state[key]
+
 # Sidebar Navigation
 def show_sidebar():
     with st.sidebar:
-        # Apply custom CSS
-        st.markdown(load_css(), unsafe_allow_html=True)
+        _sidebar_navigation()
+
+# A fragment, so the sidebar isn't re-sent when only another fragment (such
+# as the quiz card) reruns. Navigation needs the whole page, hence the
+# app-wide reruns.
+@st.fragment
+def _sidebar_navigation():
+    # Display logo
+    display_logo()
+    
+    st.title("Navigation")
+    if st.session_state.authenticated:
+        st.markdown(f"**Welcome, {st.session_state.name}**")
+        st.markdown("---")
+        
+        if st.button("📝 Take Quiz", use_container_width=True):
+            navigate_to("quiz")
+            st.rerun()
+            
+        if st.button("📊 View My Scores", use_container_width=True):
+            navigate_to("scores")
+            st.rerun()
         
-        # Display logo
-        display_logo()
+        if st.button("🔎 Verify Certificate", use_container_width=True):
+            navigate_to("verify")
+            st.rerun()
         
-        st.title("Navigation")
-        if st.session_state.authenticated:
-            st.markdown(f"**Welcome, {st.session_state.name}**")
+        if st.session_state.role == "admin":
             st.markdown("---")
+            st.markdown("### Admin Controls")
+            if st.button("⚙️ Admin Panel", use_container_width=True):
+                navigate_to("admin")
+                st.rerun()
             
-            if st.button("📝 Take Quiz", use_container_width=True):
-                navigate_to("quiz")
-                
-            if st.button("📊 View My Scores", use_container_width=True):
-                navigate_to("scores")
-            
-            if st.session_state.role == "admin":
-                st.markdown("---")
-                st.markdown("### Admin Controls")
-                if st.button("⚙️ Admin Panel", use_container_width=True):
-                    navigate_to("admin")
-                
-                # Only show documentation button to admins
-                if st.button("📚 Documentation", use_container_width=True):
-                    navigate_to("documentation")
-            
-            st.markdown("---")
-            if st.button("🚪 Logout", use_container_width=True):
-                st.session_state.authenticated = False
-                st.session_state.username = None
-                st.session_state.role = None
-                st.session_state.name = None
-                navigate_to("login")
-                st.rerun()
\ No newline at end of file
+            # Only show documentation button to admins
+            if st.button("📚 Documentation", use_container_width=True):
+                navigate_to("documentation")
+                st.rerun()
+        
+        st.markdown("---")
+        if st.button("🚪 Logout", use_container_width=True):
+            clear_quiz_state()
+            st.session_state.authenticated = False
+            st.session_state.username = None
+            st.session_state.role = None
+            st.session_state.name = None
+            navigate_to("login")
+            st.rerun()
\ No newline at end of file
@@ -0,0 +1,98 @@
+import os
+import gzip
+import json
+from modules.storage import JsonStorage, SEGMENT_SUFFIX
+
+def _storage(tmp_path, **kwargs):
+    return JsonStorage(
+        str(tmp_path / "users.json"), str(tmp_path / "questions.json"), str(tmp_path / "scores.jsonl"),
+        legacy_scores_file=str(tmp_path / "scores.json"),
+        segments_dir=str(tmp_path / "score_segments"),
+        responses_file=str(tmp_path / "responses.jsonl"),
+        **kwargs
+    )
+
+def _score(username, timestamp="2026-10-01 09:00:00"):
+    return {"username": username, "score": 9, "max_score": 10, "percentage": 90.0, "timestamp": timestamp}
+
+def _tear(path):
+    # What a crash partway through an append leaves behind
+    with open(path, "a") as f:
+        f.write('{"username": "b", "sco')
+
+def test_append_scores_after_torn_line(tmp_path):
+    storage = _storage(tmp_path)
+    storage.append_scores([_score("a")])
+    _tear(storage.scores_log_file)
+    storage.append_scores([_score("c")])
+    storage.append_scores([_score("d")])
+    assert [s["username"] for s in storage.load_scores()] == ["a", "c", "d"]
+
+def test_append_responses_after_torn_line(tmp_path):
+    storage = _storage(tmp_path)
+    storage.append_responses([{"question_id": 1, "correct": 1}])
+    _tear(storage.responses_file)
+    storage.append_responses([{"question_id": 2, "correct": 0}])
+    assert [r["question_id"] for r in storage.load_responses()] == [1, 2]
+
+def test_checkpoint_answer_after_torn_line(tmp_path, monkeypatch):
+    from modules import checkpoints
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DIR", str(tmp_path))
+    checkpoints.start_checkpoint("op", "attempt", False, [1, 2, 3])
+    checkpoints.checkpoint_answer("op", 0, 1, True)
+    _tear(checkpoints._checkpoint_path("op"))
+    checkpoints.checkpoint_answer("op", 1, 2, False)
+    assert checkpoints.load_checkpoint("op")["answers"] == [(0, 1, True), (1, 2, False)]
+
+def test_read_scores_reads_only_new_attempts(tmp_path):
+    storage = _storage(tmp_path)
+    storage.append_scores([_score("a"), _score("b")])
+    scores, cursor, reset = storage.read_scores()
+    assert reset and [s["username"] for s in scores] == ["a", "b"]
+
+    storage.append_scores([_score("c")])
+    scores, cursor, reset = storage.read_scores(cursor)
+    assert not reset and [s["username"] for s in scores] == ["c"]
+
+def test_read_scores_after_roll_over(tmp_path):
+    storage = _storage(tmp_path)
+    storage.append_scores([_score("a", "2026-09-15 12:00:00"), _score("b", "2026-10-01 00:00:00")])
+    _, cursor, _ = storage.read_scores()
+
+    storage.roll_over("2026-10")
+    storage.append_scores([_score("c", "2026-10-02 00:00:00")])
+    scores, cursor, reset = storage.read_scores(cursor)
+    assert reset and [s["username"] for s in scores] == ["a", "b", "c"]
+    assert storage.read_scores(cursor)[:1] == ([],)
+
+def test_migrate_legacy_scores(tmp_path):
+    storage = _storage(tmp_path)
+    with open(storage.legacy_scores_file, "w") as f:
+        json.dump([_score("a"), _score("b")], f)
+    assert storage.migrate_legacy_scores()
+    assert [s["username"] for s in storage.load_scores()] == ["a", "b"]
+    # The legacy file stays; the journal's existence stops a second migration
+    assert os.path.exists(storage.legacy_scores_file)
+    storage.append_scores([_score("c")])
+    assert not storage.migrate_legacy_scores()
+    assert [s["username"] for s in storage.load_scores()] == ["a", "b", "c"]
+
+def test_roll_over_seals_past_months(tmp_path):
+    storage = _storage(tmp_path)
+    storage.append_scores([_score("a", "2026-08-31 23:59:59"), _score("b", "2026-09-15 12:00:00"),
+                           _score("c", "2026-10-01 00:00:00")])
+    storage.roll_over("2026-10")
+
+    assert sorted(os.listdir(storage.segments_dir)) == ["2026-08" + SEGMENT_SUFFIX, "2026-09" + SEGMENT_SUFFIX]
+    with gzip.open(os.path.join(storage.segments_dir, "2026-09" + SEGMENT_SUFFIX), "rt") as f:
+        assert [json.loads(line)["username"] for line in f] == ["b"]
+    assert [s["username"] for s in storage.load_scores()] == ["a", "b", "c"]
+    assert [s["username"] for s in storage.load_scores("2026-09-01 00:00:00", "2026-09-30 23:59:59")] == ["b"]
+
+def test_roll_over_archives_past_retention(tmp_path):
+    storage = _storage(tmp_path, retention_months=1)
+    storage.append_scores([_score("a", "2026-08-31 23:59:59"), _score("b", "2026-09-15 12:00:00"),
+                           _score("c", "2026-10-01 00:00:00")])
+    storage.roll_over("2026-10")
+    assert os.listdir(storage.archive_dir) == ["2026-08" + SEGMENT_SUFFIX]
+    assert [s["username"] for s in storage.load_scores()] == ["b", "c"]